@@ -0,0 +1,253 @@
+"""
+Frame-path benchmark driving VideoManager + Pipeline with synthetic sources.
+
+Usage (from the repository root):
+    python -m benchmarks.run_benchmark --sources 1,4,16,64 --output bench.json
+    python -m benchmarks.run_benchmark --detector yolo --model models/yolo11n.pt
+    python -m benchmarks.run_benchmark --inference-size 640 --display-size 400x400
+    python -m benchmarks.run_benchmark --replay site.rawframes --replay-speed 0
+    python -m benchmarks.run_benchmark --compare old.json new.json
+
+Each case starts N SyntheticVideoSource threads (or N ReplayVideoSource threads
+over the same FrameRecorder file with --replay), calls Pipeline.process_sources()
+as fast as it can for --duration seconds and reports throughput, capture-to-
+annotation latency percentiles, transient allocation per frame and RSS. Output
+is a stable, key-sorted JSON document so two runs can be diffed directly.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from utils.VideoManager import VideoManager
+from utils.SyntheticVideoSource import SyntheticVideoSource
+from utils.ReplayVideoSource import ReplayVideoSource
+from detector.StubDetector import StubDetector
+from utils.ResourceManager import RESOURCES
+from pipeline import Pipeline
+
+DEFAULT_SOURCE_COUNTS: List[int] = [1, 4, 16, 64]
+ALLOC_SAMPLE_LOOPS: int = 50
+
+# Metrics where a larger value is an improvement (used by --compare)
+_HIGHER_IS_BETTER = {"fps", "frames"}
+# Reported but not judged: the loop spins faster whenever sources have nothing new
+_NO_VERDICT = {"loops"}
+
+
+def _rss_bytes() -> int:
+    """Current resident set size, or peak RSS where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+def _stop_capture(manager: VideoManager) -> None:
+    """Stop the capture threads without deactivating the sources or releasing their captures."""
+    for source in manager.sources:
+        source.running = False
+    for source in manager.sources:
+        if source.thread is not None:
+            source.thread.join()
+
+
+def _build_detector(args: argparse.Namespace) -> Optional[Any]:
+    if args.detector == "none":
+        return None
+    if args.detector == "stub":
+        return StubDetector(latency=args.stub_latency)
+    from detector.detector import Detector, DEFAULT_INPUT_SIZE  # Heavy import only when asked for
+    # Match the model input to the sources' pre-scaled frames instead of letterboxing them back up
+    return Detector(model_path=args.model, imgsz=args.inference_size or DEFAULT_INPUT_SIZE, cascade=args.cascade)
+
+
+def run_case(num_sources: int, args: argparse.Namespace, detector: Optional[Any]) -> Dict[str, Any]:
+    """Benchmark one source count and return its result record."""
+    scaling = dict(inference_size=args.inference_size, display_size=args.display_size)
+    if args.replay:
+        factory = partial(ReplayVideoSource, speed=args.replay_speed, loop=True, **scaling)
+        sources = [args.replay] * num_sources
+    else:
+        factory = partial(SyntheticVideoSource, width=args.width, height=args.height, fps=args.fps, **scaling)
+        sources = list(range(num_sources))
+    manager = VideoManager(sources=sources, source_factory=factory)
+    manager.wait_until_opened()
+    for source in manager.sources:
+        source.start()
+    pipeline = Pipeline(manager=manager, detector=detector)
+
+    tuned: Optional[str] = None
+    if args.autotune:
+        tuned = RESOURCES.autotune(pipeline.process_fresh, seconds=args.autotune).describe()
+
+    rss_before: int = _rss_bytes()
+    warmup_end: float = time.perf_counter() + args.warmup
+    while time.perf_counter() < warmup_end:
+        pipeline.process_sources()
+
+    # Timed phase: frames and latency count each captured frame once, at the first loop that sees
+    # it; outputs reused for sources that have not captured since are not throughput
+    latencies: List[float] = []
+    last_seen: Dict[str, float] = {}
+    loops: int = 0
+    start: float = time.perf_counter()
+    end: float = start + args.duration
+    while True:
+        pipeline.process_sources()
+        done: float = time.perf_counter()
+        loops += 1
+        for name, frame_time in pipeline.frame_times.items():
+            if last_seen.get(name) != frame_time:
+                last_seen[name] = frame_time
+                latencies.append(done - frame_time)
+        if done >= end:
+            break
+    elapsed: float = time.perf_counter() - start
+    rss_after: int = _rss_bytes()
+
+    # Allocation phase runs separately because tracemalloc slows everything down. Capture is
+    # stopped first so only the processing path is traced, not N capture threads copying and
+    # downscaling frames; the sources stay active and keep serving their last frame.
+    _stop_capture(manager)
+    pipeline.reuse_outputs = False  # Every sample must run the detection path on the frames left behind
+    tracemalloc.start()
+    alloc_per_frame: List[float] = []
+    for _ in range(ALLOC_SAMPLE_LOOPS):
+        before: int = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        frames_out = pipeline.process_sources()
+        peak: int = tracemalloc.get_traced_memory()[1]
+        if frames_out:
+            alloc_per_frame.append((peak - before) / len(frames_out))
+        del frames_out
+    tracemalloc.stop()
+
+    for source in manager.sources:
+        source.stop()
+
+    lat = np.asarray(latencies) if latencies else np.zeros(1)
+    return {
+        "sources": num_sources,
+        "loops": loops,
+        "frames": len(latencies),
+        "fps": round(len(latencies) / elapsed, 2),
+        "latency_p50_ms": round(float(np.percentile(lat, 50)) * 1000, 3),
+        "latency_p99_ms": round(float(np.percentile(lat, 99)) * 1000, 3),
+        "alloc_bytes_per_frame": int(np.mean(alloc_per_frame)) if alloc_per_frame else 0,
+        "rss_mb": round(rss_after / 2**20, 1),
+        "rss_growth_mb": round((rss_after - rss_before) / 2**20, 1),
+        "resource_config": tuned,
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    detector = _build_detector(args)
+    results: List[Dict[str, Any]] = []
+    for n in args.sources:
+        print(f"[BENCH] {n} source(s) ...", file=sys.stderr)
+        result = run_case(n, args, detector)
+        print(f"[BENCH] {n} source(s): {result['fps']} fps, "
+              f"p99 {result['latency_p99_ms']} ms", file=sys.stderr)
+        results.append(result)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "detector": args.detector,
+            "cascade": args.cascade if args.detector == "yolo" else None,
+            "stub_latency": args.stub_latency if args.detector == "stub" else None,
+            "resolution": None if args.replay else [args.width, args.height],
+            "source_fps": None if args.replay else args.fps,
+            "replay": args.replay,
+            "replay_speed": args.replay_speed if args.replay else None,
+            "duration": args.duration,
+            "inference_size": args.inference_size,
+            "display_size": args.display_size,
+        },
+        "results": results,
+    }
+
+
+def compare(base_path: str, new_path: str) -> None:
+    """Print per-metric relative change between two benchmark outputs."""
+    with open(base_path) as f:
+        base = {r["sources"]: r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = {r["sources"]: r for r in json.load(f)["results"]}
+
+    for n in sorted(set(base) & set(new)):
+        print(f"== {n} source(s)")
+        for key in sorted(base[n]):
+            if key == "sources":
+                continue
+            old_v, new_v = base[n][key], new[n].get(key)
+            if not isinstance(old_v, (int, float)) or not isinstance(new_v, (int, float)):
+                continue
+            change = (new_v - old_v) / old_v * 100 if old_v else 0.0
+            better = change > 0 if key in _HIGHER_IS_BETTER else change < 0
+            marker = "" if abs(change) < 5 or key in _NO_VERDICT else ("  (better)" if better else "  (WORSE)")
+            print(f"  {key:<24} {old_v:>12} -> {new_v:<12} {change:+7.1f}%{marker}")
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", type=lambda s: [int(x) for x in s.split(",")], default=DEFAULT_SOURCE_COUNTS,
+                        help="Comma-separated source counts (default: 1,4,16,64)")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=float, default=30.0, help="Capture rate of each synthetic source")
+    parser.add_argument("--duration", type=float, default=10.0, help="Timed seconds per case")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Untimed seconds per case")
+    parser.add_argument("--inference-size", type=int, default=None,
+                        help="Have sources pre-scale frames for the detector (e.g. 640)")
+    parser.add_argument("--display-size", type=lambda s: tuple(int(x) for x in s.split("x")), default=None,
+                        help="Have sources produce WxH display thumbnails (e.g. 400x400)")
+    parser.add_argument("--detector", choices=("stub", "yolo", "none"), default="stub")
+    parser.add_argument("--stub-latency", type=float, default=0.005, help="Seconds per frame for the stub detector")
+    parser.add_argument("--model", default="models/yolo11n.pt", help="Weights for --detector yolo")
+    parser.add_argument("--replay", help="Replay this FrameRecorder file instead of synthetic frames")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay speed factor, 0 = unthrottled")
+    parser.add_argument("--cascade", choices=("resolution", "crop"), default=None,
+                        help="Enable the Detector resolution cascade (--detector yolo only)")
+    parser.add_argument("--autotune", type=float, default=None, metavar="SECONDS",
+                        help="Sweep thread/affinity configurations for SECONDS each before measuring")
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Diff two previous outputs and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = json.dumps(run(args), indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+        print(f"[BENCH] Results written to {args.output}", file=sys.stderr)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
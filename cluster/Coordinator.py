@@ -0,0 +1,353 @@
+"""
+Central coordinator sharding video sources across worker nodes.
+
+Usage:
+    python -m cluster.Coordinator --port 9200 0 1 2 rtsp://cam/3 videos/lobby.mp4
+    python -m cluster.Coordinator --sources-file cameras.txt
+
+Each worker (python -m cluster.Worker) connects, announces its capacity and
+then reports measured per-source cost, detections and source health every
+second. Sources are assigned by measured cost rather than count, rebalanced
+when normalized node load diverges, and reassigned as soon as a node
+disconnects or stops reporting.
+"""
+import argparse
+import socket
+import threading
+import time
+from typing import Any, Dict, Final, List, Optional, Set, Union
+
+from cluster.Protocol import Connection, DEFAULT_PORT, Message
+from utils.EventBus import EVENTS, CONTROL, DETECTION, SOURCE, ConsoleHandler
+
+SourceType = Union[int, str]
+
+DEFAULT_SOURCE_COST: Final[float] = 0.15   # Loop-seconds/second assumed before a source is measured (~5 ms/frame at 30 fps)
+COST_SMOOTHING: Final[float] = 0.3         # EWMA weight of each new cost measurement
+NODE_TIMEOUT: Final[float] = 5.0           # Seconds without a report before a node is declared failed
+REBALANCE_INTERVAL: Final[float] = 10.0
+IMBALANCE_THRESHOLD: Final[float] = 0.15   # Load spread, as a fraction of the peak, that triggers moves
+MAX_MOVES_PER_ROUND: Final[int] = 2
+MOVE_COOLDOWN: Final[float] = 30.0         # A moved source stays put while its cost re-settles
+
+
+def plan_assignment(costs: Dict[str, float], capacities: Dict[str, float], current: Dict[str, str],
+                    pinned: Optional[Set[str]] = None, imbalance: float = IMBALANCE_THRESHOLD,
+                    max_moves: int = MAX_MOVES_PER_ROUND) -> Dict[str, str]:
+    """
+    Compute a source -> node assignment minimising peak normalized load with few moves.
+
+    Existing assignments to live nodes are kept. Unassigned sources are placed
+    largest-cost first on the node with the lowest resulting load/capacity.
+    Then, while the spread between the most and least loaded nodes exceeds
+    imbalance times the peak normalized load, up to max_moves unpinned sources are moved from the most to the
+    least loaded node if that lowers the peak.
+
+    Args:
+        costs (Dict[str, float]): Estimated cost of every source that must be placed
+        capacities (Dict[str, float]): Relative capacity of every live node
+        current (Dict[str, str]): Present assignment (may reference dead nodes or removed sources)
+        pinned (Optional[Set[str]]): Sources that must not be moved this round
+        imbalance (float): Allowed load spread relative to the most loaded node
+        max_moves (int): Rebalancing moves allowed this round
+
+    Returns:
+        Dict[str, str]: New assignment; empty when there are no nodes
+    """
+    if not capacities:
+        return {}
+    pinned = pinned or set()
+    nodes: List[str] = sorted(capacities)
+    assignment: Dict[str, str] = {s: n for s, n in current.items() if n in capacities and s in costs}
+    load: Dict[str, float] = {n: 0.0 for n in nodes}
+    for source, node in assignment.items():
+        load[node] += costs[source]
+
+    def norm(node: str) -> float:
+        return load[node] / capacities[node]
+
+    for source in sorted((s for s in costs if s not in assignment), key=lambda s: (-costs[s], s)):
+        node = min(nodes, key=lambda n: ((load[n] + costs[source]) / capacities[n], n))
+        assignment[source] = node
+        load[node] += costs[source]
+
+    for _ in range(max_moves):
+        high, low = max(nodes, key=norm), min(nodes, key=norm)
+        if norm(high) - norm(low) <= imbalance * norm(high):
+            break
+        best: Optional[str] = None
+        best_peak: float = norm(high)
+        for source, node in sorted(assignment.items()):
+            if node != high or source in pinned:
+                continue
+            peak = max((load[high] - costs[source]) / capacities[high],
+                       (load[low] + costs[source]) / capacities[low])
+            if peak < best_peak - 1e-9:
+                best, best_peak = source, peak
+        if best is None:
+            break
+        assignment[best] = low
+        load[high] -= costs[best]
+        load[low] += costs[best]
+    return assignment
+
+
+class _Node:
+    __slots__ = ('node_id', 'conn', 'capacity', 'last_seen', 'load', 'active', 'failed')
+
+    def __init__(self, node_id: str, conn: Connection, capacity: float) -> None:
+        self.node_id: str = node_id
+        self.conn: Connection = conn
+        self.capacity: float = max(capacity, 1e-3)
+        self.last_seen: float = time.monotonic()
+        self.load: float = 0.0
+        self.active: List[str] = []
+        self.failed: Dict[str, str] = {}
+
+
+class Coordinator:
+    """
+    Assigns sources to worker nodes and aggregates their results.
+
+    Args:
+        sources (Dict[str, SourceType]): Source name -> camera index / path / URL
+        host (str): Listen address
+        port (int): Listen port (0 picks a free one)
+    """
+
+    def __init__(self, sources: Dict[str, SourceType], host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> None:
+        self.sources: Dict[str, SourceType] = dict(sources)
+        self.host: str = host
+        self.port: int = port
+        self.costs: Dict[str, float] = {}          # name -> EWMA measured cost
+        self.assignment: Dict[str, str] = {}       # name -> node id
+        self.detections: Dict[str, Dict[str, Any]] = {}  # name -> {"count", "node", "time"}
+        self.health: Dict[str, Dict[str, Any]] = {}      # name -> last source event
+        self._moved_at: Dict[str, float] = {}
+        self._nodes: Dict[str, _Node] = {}
+        self._lock = threading.RLock()
+        self._server: Optional[socket.socket] = None
+        self._running: bool = False
+        self._last_rebalance: float = 0.0
+
+    # ----- lifecycle -----
+
+    def start(self) -> None:
+        self._server = socket.create_server((self.host, self.port))
+        self.port = self._server.getsockname()[1]
+        self._running = True
+        threading.Thread(target=self._accept_loop, daemon=True, name="CoordinatorAccept").start()
+        threading.Thread(target=self._monitor_loop, daemon=True, name="CoordinatorMonitor").start()
+        EVENTS.emit(CONTROL, "coordinator", action="listening", address=f"{self.host}:{self.port}")
+
+    def stop(self) -> None:
+        self._running = False
+        if self._server is not None:
+            self._server.close()
+        with self._lock:
+            nodes = list(self._nodes.values())
+            self._nodes.clear()
+        for node in nodes:
+            node.conn.close()
+
+    # ----- networking -----
+
+    def _accept_loop(self) -> None:
+        while self._running:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(Connection(sock),), daemon=True,
+                             name="CoordinatorConn").start()
+
+    def _serve(self, conn: Connection) -> None:
+        node: Optional[_Node] = None
+        try:
+            hello = conn.recv()
+            if not hello or hello.get("type") != "hello":
+                conn.close()
+                return
+            node = _Node(str(hello["node"]), conn, float(hello.get("capacity", 1.0)))
+            self._register(node)
+            while self._running:
+                message = conn.recv()
+                if message is None:
+                    break
+                if message.get("type") == "report":
+                    self._on_report(node, message)
+        except (OSError, ValueError) as e:
+            if node is not None:
+                EVENTS.emit(CONTROL, node.node_id, action="node error", error=str(e))
+        finally:
+            if node is not None:
+                self._drop_node(node, reason="disconnected")
+
+    def _register(self, node: _Node) -> None:
+        with self._lock:
+            previous = self._nodes.get(node.node_id)
+            self._nodes[node.node_id] = node
+        if previous is not None:
+            previous.conn.close()  # Reconnect with the same id replaces the stale connection
+        EVENTS.emit(CONTROL, node.node_id, action="node joined", capacity=node.capacity)
+        self.rebalance(force=True, resend={node.node_id})
+
+    def _drop_node(self, node: _Node, reason: str) -> None:
+        with self._lock:
+            if self._nodes.get(node.node_id) is not node:
+                return
+            del self._nodes[node.node_id]
+        node.conn.close()
+        EVENTS.emit(CONTROL, node.node_id, action="node failed", reason=reason)
+        self.rebalance(force=True)
+
+    def _on_report(self, node: _Node, message: Message) -> None:
+        now: float = time.time()
+        with self._lock:
+            node.last_seen = time.monotonic()
+            node.load = float(message.get("load", 0.0))
+            node.active = list(message.get("active", []))
+            node.failed = dict(message.get("failed", {}))
+            for name, cost in message.get("costs", {}).items():
+                if self.assignment.get(name) != node.node_id:
+                    continue  # Late report for a source that has already moved
+                previous = self.costs.get(name)
+                self.costs[name] = cost if previous is None else previous + COST_SMOOTHING * (cost - previous)
+            changed: List[tuple] = []
+            for name, count in message.get("detections", {}).items():
+                if self.detections.get(name, {}).get("count") != count:
+                    changed.append((name, count))
+                self.detections[name] = {"count": count, "node": node.node_id, "time": now}
+            for event in message.get("events", []):
+                self.health[event.get("source", "?")] = {**event, "node": node.node_id}
+
+        # Central, de-duplicated log of what every node sees
+        for name, count in changed:
+            EVENTS.emit(DETECTION, name, count=count, node=node.node_id)
+        for event in message.get("events", []):
+            EVENTS.emit(SOURCE, event.get("source", "?"), node=node.node_id,
+                        **{k: v for k, v in event.items() if k in ("status", "error")})
+
+    # ----- assignment -----
+
+    def _monitor_loop(self) -> None:
+        while self._running:
+            time.sleep(0.5)
+            deadline: float = time.monotonic() - NODE_TIMEOUT
+            with self._lock:
+                stale = [n for n in self._nodes.values() if n.last_seen < deadline]
+            for node in stale:
+                self._drop_node(node, reason=f"no report for {NODE_TIMEOUT:.0f}s")
+            if time.monotonic() - self._last_rebalance >= REBALANCE_INTERVAL:
+                self.rebalance()
+
+    def _estimated_costs(self) -> Dict[str, float]:
+        known = list(self.costs.values())
+        default: float = sum(known) / len(known) if known else DEFAULT_SOURCE_COST
+        return {name: self.costs.get(name, default) for name in self.sources}
+
+    def rebalance(self, force: bool = False, resend: Optional[Set[str]] = None) -> None:
+        """
+        Recompute the assignment and push changed source sets to their nodes.
+
+        Args:
+            force (bool): Ignore the move cooldown (node joined or failed) so
+                orphaned sources are placed immediately
+            resend (Optional[Set[str]]): Nodes that get their full set even if unchanged
+        """
+        with self._lock:
+            self._last_rebalance = time.monotonic()
+            now: float = time.monotonic()
+            pinned: Set[str] = set() if force else {
+                s for s, t in self._moved_at.items() if now - t < MOVE_COOLDOWN
+            }
+            capacities = {node_id: node.capacity for node_id, node in self._nodes.items()}
+            new_assignment = plan_assignment(self._estimated_costs(), capacities, self.assignment, pinned)
+
+            for name, node_id in new_assignment.items():
+                if self.assignment.get(name) != node_id:
+                    self._moved_at[name] = now
+            touched: Set[str] = set(resend or ())
+            for name in set(self.assignment) | set(new_assignment):
+                old_owner, new_owner = self.assignment.get(name), new_assignment.get(name)
+                if old_owner != new_owner:
+                    touched.update(n for n in (old_owner, new_owner) if n is not None)
+            self.assignment = new_assignment
+            messages = {
+                node_id: {"type": "assign",
+                          "sources": {n: self.sources[n] for n, owner in new_assignment.items() if owner == node_id}}
+                for node_id in touched if node_id in self._nodes
+            }
+            targets = {node_id: self._nodes[node_id] for node_id in messages}
+
+        for node_id, message in messages.items():
+            try:
+                targets[node_id].conn.send(message)
+            except OSError:
+                pass  # Its reader thread will notice and trigger another rebalance
+        if messages:
+            EVENTS.emit(CONTROL, "coordinator", action="assignment",
+                        nodes={n: len(m["sources"]) for n, m in messages.items()})
+
+    # ----- status -----
+
+    def status(self) -> Dict[str, Any]:
+        """Snapshot of nodes, assignment, costs, detections and source health."""
+        with self._lock:
+            return {
+                "nodes": {
+                    node_id: {"capacity": n.capacity, "load": round(n.load, 3),
+                              "active": n.active, "failed": n.failed}
+                    for node_id, n in self._nodes.items()
+                },
+                "assignment": dict(self.assignment),
+                "unassigned": sorted(set(self.sources) - set(self.assignment)),
+                "costs": {k: round(v, 4) for k, v in self.costs.items()},
+                "detections": dict(self.detections),
+                "health": dict(self.health),
+            }
+
+
+def _parse_source(value: str) -> SourceType:
+    return int(value) if value.isdigit() else value
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="*", help="Camera indices, files or URLs")
+    parser.add_argument("--sources-file", help="File with one source per line")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--status-interval", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    values: List[str] = list(args.sources)
+    if args.sources_file:
+        with open(args.sources_file) as f:
+            values += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not values:
+        parser.error("no sources given")
+
+    EVENTS.add_handler(ConsoleHandler())
+    EVENTS.start()
+    coordinator = Coordinator({f"Source {i}": _parse_source(v) for i, v in enumerate(values)},
+                              host=args.host, port=args.port)
+    coordinator.start()
+    try:
+        while True:
+            time.sleep(args.status_interval)
+            status = coordinator.status()
+            for node_id, node in status["nodes"].items():
+                print(f"[STATUS] {node_id}: load={node['load']} capacity={node['capacity']} "
+                      f"sources={len(node['active'])} failed={len(node['failed'])}")
+            if status["unassigned"]:
+                print(f"[STATUS] unassigned: {status['unassigned']}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        coordinator.stop()
+        EVENTS.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Coordinator <-> worker wire protocol: one JSON object per line over TCP.
+
+Worker -> coordinator:
+    {"type": "hello",  "node": str, "capacity": float}
+    {"type": "report", "node": str, "load": float, "costs": {source: float},
+     "active": [source], "failed": {source: reason}, "detections": {source: int},
+     "events": [event dict]}
+
+Coordinator -> worker:
+    {"type": "assign", "sources": {name: source}}   # Full desired set, not a delta
+
+costs are the processing-loop seconds per second a source needs to keep up
+with its camera (measured time per new frame x capture fps), so they do not
+depend on how busy the node currently is. load is their sum and capacity is
+what the node's loop can supply in the same unit (1.0 for one loop), so
+load / capacity > 1 means the node is dropping frames.
+"""
+import json
+import socket
+import threading
+from typing import Any, Dict, Final, Optional, Tuple
+
+DEFAULT_PORT: Final[int] = 9200
+MAX_LINE: Final[int] = 1 << 20  # Reject absurd messages instead of buffering them forever
+
+Message = Dict[str, Any]
+
+
+def parse_address(address: str, default_port: int = DEFAULT_PORT) -> Tuple[str, int]:
+    """'host:port' or 'host' -> (host, port)."""
+    host, _, port = address.rpartition(":")
+    if not host:
+        return port or "127.0.0.1", default_port
+    return host, int(port)
+
+
+class Connection:
+    """Line-delimited JSON messages over a connected socket. send() is thread-safe."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock: socket.socket = sock
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = sock.makefile("r", encoding="utf-8", newline="\n")
+        self._send_lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, address: Tuple[str, int], timeout: float = 5.0) -> "Connection":
+        sock = socket.create_connection(address, timeout=timeout)
+        sock.settimeout(None)
+        return cls(sock)
+
+    def send(self, message: Message) -> None:
+        data = (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._send_lock:
+            self.sock.sendall(data)
+
+    def recv(self) -> Optional[Message]:
+        """Next message, or None when the peer closed the connection."""
+        line = self._reader.readline(MAX_LINE)
+        if not line:
+            return None
+        if not line.endswith("\n"):
+            raise ValueError("Protocol message too long")
+        return json.loads(line)
+
+    def close(self) -> None:
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._reader.close()
+        self.sock.close()
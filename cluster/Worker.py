@@ -0,0 +1,225 @@
+"""
+Worker node: runs VideoManager + Detector for the sources the coordinator assigns.
+
+Usage:
+    python -m cluster.Worker --coordinator 127.0.0.1:9200 --node gpu-box-1
+    python -m cluster.Worker --node w1 --synthetic --stub-detector   # No cameras, weights or torch needed
+
+Several workers can run on one Linux host against the same coordinator.
+Sources are processed by a single loop, so a node's capacity is 1.0 loop-
+second per second by default; --capacity overrides it, e.g. 0.8 to keep
+headroom on a node that also does other work.
+"""
+import argparse
+import threading
+import time
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+from cluster.Protocol import Connection, DEFAULT_PORT, Message, parse_address
+from utils.EventBus import EVENTS, DETECTION, SOURCE, Event, EventHandler, ConsoleHandler
+from utils.VideoManager import VideoManager, SourceFactory
+from utils.VideoSource import VideoSource
+from pipeline import Pipeline
+
+REPORT_INTERVAL: float = 1.0
+DEFAULT_CAPACITY: float = 1.0  # One processing loop: at most one second of work per second
+RECONNECT_DELAY: float = 2.0
+
+
+class _ReportCollector(EventHandler):
+    """Event bus handler keeping what the next report to the coordinator should carry."""
+
+    def __init__(self) -> None:
+        self.detections: Dict[str, int] = {}
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def handle(self, event: Event) -> None:
+        with self._lock:
+            if event.kind == DETECTION:
+                self.detections[event.source] = event.data.get("count", 0)
+            elif event.kind == SOURCE:
+                self.events.append(event.to_dict())
+
+    def drain(self) -> tuple:
+        with self._lock:
+            detections, events = dict(self.detections), self.events
+            self.events = []
+        return detections, events
+
+
+class Worker:
+    """
+    Connects to a coordinator and processes whatever sources it is assigned.
+
+    Args:
+        coordinator (str): 'host:port' of the coordinator
+        node_id (str): Unique node name
+        detector: Detector-like object with annotate()/annotate_scaled(), or None
+        source_factory (Optional[SourceFactory]): Passed to VideoManager
+        capacity (Optional[float]): Loop-seconds per second this node can supply, in the units of its costs
+        loop_fps (float): Processing loop rate cap
+    """
+
+    def __init__(self, coordinator: str, node_id: str, detector: Any = None,
+                 source_factory: Optional[SourceFactory] = None, capacity: Optional[float] = None,
+                 loop_fps: float = 30.0) -> None:
+        self.address = parse_address(coordinator)
+        self.node_id: str = node_id
+        self.capacity: float = capacity if capacity is not None else DEFAULT_CAPACITY
+        self.loop_fps: float = loop_fps
+        self.manager = VideoManager(sources=[], source_factory=source_factory)
+        self.manager.start_all(wait=False)  # Assigned sources start as soon as they open
+        self.pipeline = Pipeline(manager=self.manager, detector=detector)
+        self.assigned: Dict[str, Any] = {}
+        self._collector = _ReportCollector()
+        self._conn: Optional[Connection] = None
+        self._running: bool = False
+
+    def _apply_assignment(self, sources: Dict[str, Any]) -> None:
+        """Converge the local VideoManager on the coordinator's full desired set."""
+        for name in list(self.assigned):
+            if name not in sources or sources[name] != self.assigned[name]:
+                self.manager.remove_source(name)
+                del self.assigned[name]
+        for name, source in sources.items():
+            if name not in self.assigned:
+                self.manager.add_new_source(source, name=name)
+                self.assigned[name] = source
+
+    def _receive_loop(self, conn: Connection) -> None:
+        try:
+            while self._running:
+                message = conn.recv()
+                if message is None:
+                    break
+                if message.get("type") == "assign":
+                    self._apply_assignment(message.get("sources", {}))
+        except (OSError, ValueError):
+            pass
+        finally:
+            if self._conn is conn:
+                self._conn = None
+
+    def _connect(self) -> None:
+        conn = Connection.connect(self.address)
+        conn.send({"type": "hello", "node": self.node_id, "capacity": self.capacity})
+        self._conn = conn
+        threading.Thread(target=self._receive_loop, args=(conn,), daemon=True, name="WorkerReceive").start()
+        print(f"[INFO] Node '{self.node_id}' connected to {self.address[0]}:{self.address[1]}")
+
+    def _source_costs(self) -> Dict[str, float]:
+        """
+        Loop-seconds per second each source needs: time per new frame times its capture rate.
+
+        Unlike time spent per wall-clock second, this does not flatten to
+        1/N once the loop is saturated, so overloaded nodes report load > capacity.
+        """
+        capture_fps: Dict[str, float] = {s.name: s.source_fps for s in self.manager.sources}
+        costs: Dict[str, float] = {}
+        for name, seconds in self.pipeline.source_seconds.items():
+            frames: int = self.pipeline.source_frames.get(name, 0)
+            if frames and name in capture_fps:
+                costs[name] = seconds / frames * capture_fps[name]
+        self.pipeline.source_seconds = {}
+        self.pipeline.source_frames = {}
+        return costs
+
+    def _report(self) -> None:
+        costs: Dict[str, float] = self._source_costs()
+        detections, events = self._collector.drain()
+        message: Message = {
+            "type": "report",
+            "node": self.node_id,
+            "load": sum(costs.values()),
+            "costs": costs,
+            "active": [s.name for s in self.manager.get_active_sources()],
+            "failed": dict(self.manager.failed),
+            "detections": detections,
+            "events": events,
+        }
+        if self._conn is not None:
+            try:
+                self._conn.send(message)
+            except OSError:
+                self._conn = None
+
+    def run(self) -> None:
+        """Process assigned sources until interrupted, reconnecting to the coordinator as needed."""
+        EVENTS.add_handler(self._collector)
+        EVENTS.start()
+        self._running = True
+        last_report: float = time.perf_counter()
+        last_attempt: float = 0.0
+        min_loop: float = 1.0 / self.loop_fps
+        try:
+            while self._running:
+                loop_start: float = time.perf_counter()
+                if self._conn is None and loop_start - last_attempt >= RECONNECT_DELAY:
+                    last_attempt = loop_start
+                    try:
+                        self._connect()
+                    except OSError as e:
+                        print(f"[ERROR] Cannot reach coordinator: {e}")
+
+                self.pipeline.process_sources()
+
+                now: float = time.perf_counter()
+                if now - last_report >= REPORT_INTERVAL:
+                    self._report()
+                    last_report = now
+                elapsed: float = time.perf_counter() - loop_start
+                if elapsed < min_loop:
+                    time.sleep(min_loop - elapsed)
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        for name in list(self.assigned):
+            self.manager.remove_source(name)
+        self.assigned.clear()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--coordinator", default=f"127.0.0.1:{DEFAULT_PORT}")
+    parser.add_argument("--node", required=True, help="Unique node id")
+    parser.add_argument("--capacity", type=float, default=None)
+    parser.add_argument("--model", default="models/yolo11n.pt")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="Treat assigned sources as SyntheticVideoSource seeds instead of real cameras")
+    parser.add_argument("--stub-detector", action="store_true", help="Use StubDetector instead of YOLO")
+    parser.add_argument("--verbose", action="store_true", help="Also print local events")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        from utils.SyntheticVideoSource import SyntheticVideoSource
+        source_factory: SourceFactory = partial(SyntheticVideoSource, width=640, height=360)
+    else:
+        source_factory = VideoSource
+    if args.stub_detector:
+        from detector.StubDetector import StubDetector
+        detector = StubDetector()
+    else:
+        from detector.detector import Detector
+        detector = Detector(model_path=args.model)
+
+    if args.verbose:
+        EVENTS.add_handler(ConsoleHandler())
+    worker = Worker(args.coordinator, args.node, detector=detector,
+                    source_factory=source_factory, capacity=args.capacity)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        EVENTS.stop()
+
+
+if __name__ == "__main__":
+    main()
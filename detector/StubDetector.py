@@ -0,0 +1,49 @@
+import time
+import cv2
+import numpy as np
+import numpy.typing as npt
+from typing import Final, Optional
+from utils.EventBus import EVENTS
+
+DEFAULT_STUB_LATENCY: Final[float] = 0.005  # Roughly yolo11n on a mid-range GPU
+
+
+class StubDetector:
+    """
+    Drop-in replacement for Detector that needs neither torch nor model weights.
+
+    annotate() waits for a fixed latency (sleeping, so the GIL is released the
+    way it is during real GPU inference) and draws one box on a copy of the
+    frame, reproducing the allocation pattern of Results.plot(). Like Detector
+    it reports the count (always that one box) to EVENTS.detection(), so the
+    event and cluster aggregation paths run without torch too.
+
+    Attributes:
+        latency (float): Simulated inference time per frame in seconds
+        calls (int): Number of frames annotated so far
+    """
+
+    __slots__ = ('latency', 'calls')
+
+    def __init__(self, latency: float = DEFAULT_STUB_LATENCY) -> None:
+        self.latency: float = latency
+        self.calls: int = 0
+
+    def annotate(self, frame: npt.NDArray[np.uint8], source: Optional[str] = None,
+                 track: bool = True) -> npt.NDArray[np.uint8]:
+        return self._annotate(frame, source, track)
+
+    def annotate_scaled(self, frame: npt.NDArray[np.uint8], display: npt.NDArray[np.uint8],
+                        source: Optional[str] = None) -> npt.NDArray[np.uint8]:
+        return self._annotate(display, source, True)
+
+    def _annotate(self, display: npt.NDArray[np.uint8], source: Optional[str], track: bool) -> npt.NDArray[np.uint8]:
+        if self.latency > 0:
+            time.sleep(self.latency)
+        self.calls += 1
+        annotated: npt.NDArray[np.uint8] = display.copy()
+        h, w = annotated.shape[:2]
+        cv2.rectangle(annotated, (w // 4, h // 4), (3 * w // 4, 3 * h // 4), (0, 255, 0), 2)
+        if track:
+            EVENTS.detection(source or "default", 1)
+        return annotated
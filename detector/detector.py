@@ -1,11 +1,16 @@
 from ultralytics import YOLO
 import torch
+import cv2
 import numpy as np
 import numpy.typing as npt
 import os
-from typing import List, Final
+import time
+from typing import Dict, List, Final, Optional, Tuple
 from functools import lru_cache
 import warnings
+from utils.Metrics import METRICS, BATCH_BUCKETS
+from utils.EventBus import EVENTS
+from utils.ResourceManager import RESOURCES
 
 # Suppress unnecessary warnings for cleaner output
 warnings.filterwarnings("ignore", category=UserWarning)
@@ -15,6 +20,42 @@ YOLO_CLASSES: Final[List[int]] = [0]  # Person class only for optimized detectio
 DEFAULT_MODEL_PATH: Final[str] = "models/yolo11n.pt"
 MAX_DETECTIONS: Final[int] = 200
 DEFAULT_CONFIDENCE: Final[float] = 0.50
+DEFAULT_INPUT_SIZE: Final[int] = 640  # YOLO inference size (imgsz); sources can pre-scale to this
+BOX_COLOR: Final[tuple] = (0, 255, 0)
+
+# Resolution cascade: cheap low-res pass on every frame, escalate only when needed
+CASCADE_LOW_SIZE: Final[int] = 320
+CASCADE_AMBIGUOUS_CONF: Final[float] = 0.25   # Low-res scores in [this, conf) are "ambiguous"
+CASCADE_MIN_BOX_HEIGHT: Final[float] = 0.10   # Person boxes shorter than this fraction of the frame escalate
+CASCADE_CROP_MARGIN: Final[float] = 0.25      # Crop escalation pads the candidate region by this fraction
+CASCADE_MODES: Final[Tuple[str, ...]] = ("resolution", "crop")
+
+# Per-stage inference metrics (stage timings come from ultralytics' own Results.speed)
+_STAGE_SECONDS = METRICS.histogram("detector_stage_seconds", "Detector time per stage (preprocess/inference/postprocess/plot)")
+_DETECT_SECONDS = METRICS.histogram("detector_detect_seconds", "Wall time of a full Detector._detect call")
+_BATCH_SIZE = METRICS.histogram("detector_batch_size", "Frames per inference call", BATCH_BUCKETS)
+_CASCADE_FRAMES = METRICS.counter("detector_cascade_frames", "Frames run through the low-res cascade pass")
+_CASCADE_ESCALATIONS = METRICS.counter("detector_cascade_escalations", "Cascade escalations to the high-res pass")
+
+
+class CascadeStats:
+    """Per-source cascade counters and the tracking state used to decide escalation."""
+    
+    __slots__ = ('frames', 'escalations', 'reasons', 'last_count', '_m_frames', '_m_escalations')
+    
+    def __init__(self, source: str) -> None:
+        self.frames: int = 0
+        self.escalations: int = 0
+        self.reasons: Dict[str, int] = {"ambiguous": 0, "small": 0, "lost": 0}
+        self.last_count: int = 0  # Confident people in this source's previous frame
+        self._m_frames = _CASCADE_FRAMES.labels(source=source)
+        self._m_escalations = {
+            reason: _CASCADE_ESCALATIONS.labels(source=source, reason=reason) for reason in self.reasons
+        }
+    
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalations / self.frames if self.frames else 0.0
 
 
 class Detector:
@@ -30,27 +71,45 @@ class Detector:
         model (YOLO): Loaded YOLO model instance
         max_det (int): Maximum number of detections per frame
         verbose (bool): Whether to show verbose output
+        imgsz (int): Inference input size (longest side)
+        cascade (Optional[str]): Cascade escalation mode ('resolution', 'crop') or None when disabled
+        low_imgsz (int): Input size of the cascade's first pass
+        cascade_stats (Dict[str, CascadeStats]): Per-source escalation statistics
     """
     
-    __slots__ = ('device', 'half', 'model', 'max_det', 'verbose')  # Memory optimization
+    __slots__ = ('device', 'half', 'model', 'max_det', 'verbose', 'imgsz',
+                 'cascade', 'low_imgsz', 'cascade_stats',
+                 '_m_stages', '_m_detect', '_m_batch')  # Memory optimization
     
-    def __init__(self, model_path: str = DEFAULT_MODEL_PATH) -> None:
+    def __init__(self, model_path: str = DEFAULT_MODEL_PATH, imgsz: int = DEFAULT_INPUT_SIZE,
+                 cascade: Optional[str] = None, low_imgsz: int = CASCADE_LOW_SIZE) -> None:
         """
         Initialize the optimized YOLO detector.
         
         Args:
             model_path (str): Path to the YOLO .pt model file
+            imgsz (int): Inference input size; VideoSource(inference_size=imgsz) pre-scales to match
+            cascade (Optional[str]): Enable the resolution cascade. 'resolution' re-runs the whole
+                frame at imgsz when escalating; 'crop' re-runs only the region around candidates
+            low_imgsz (int): Input size of the cheap first pass when cascade is enabled
             
         Raises:
             FileNotFoundError: If model file doesn't exist
             RuntimeError: If model loading fails
+            ValueError: If cascade is not a known mode
         """
+        if cascade is not None and cascade not in CASCADE_MODES:
+            raise ValueError(f"Unknown cascade mode '{cascade}', expected one of {CASCADE_MODES}")
         self._validate_model_path(model_path)
         self._setup_device()
         self._load_model(model_path)
-        self._configure_parameters()
+        self._configure_parameters(imgsz)
+        self.cascade: Optional[str] = cascade
+        self.low_imgsz: int = low_imgsz
+        self.cascade_stats: Dict[str, CascadeStats] = {}
+        self._bind_metrics()
         
-        print(f"[INFO] Detector initialized - Device: {self.device}, FP16: {self.half}")
+        print(f"[INFO] Detector initialized - Device: {self.device}, FP16: {self.half}, Cascade: {self.cascade}")
     
     def _validate_model_path(self, model_path: str) -> None:
         """Validate that model file exists."""
@@ -59,6 +118,9 @@ class Detector:
     
     def _setup_device(self) -> None:
         """Configure optimal computation device and precision."""
+        # Thread counts and inference-core pinning must precede model load so torch's pool inherits them
+        RESOURCES.apply_inference()
+        
         self.device: str = "cuda:0" if torch.cuda.is_available() else "cpu"
         self.half: bool = self.device.startswith("cuda")
         
@@ -79,18 +141,30 @@ class Detector:
         except Exception as e:
             raise RuntimeError(f"Failed to load model: {e}")
     
-    def _configure_parameters(self) -> None:
+    def _configure_parameters(self, imgsz: int = DEFAULT_INPUT_SIZE) -> None:
         """Set optimized inference parameters."""
+        self.imgsz: int = imgsz
         self.max_det: int = MAX_DETECTIONS
         self.verbose: bool = False  # Reduce I/O overhead
     
-    def _detect(self, frame: npt.NDArray[np.uint8], conf: float = DEFAULT_CONFIDENCE):
+    def _bind_metrics(self) -> None:
+        """Resolve labelled metric series once to keep lookups off the inference path."""
+        self._m_stages = {
+            stage: _STAGE_SECONDS.labels(stage=stage)
+            for stage in ("preprocess", "inference", "postprocess", "plot")
+        }
+        self._m_detect = _DETECT_SECONDS.labels()
+        self._m_batch = _BATCH_SIZE.labels()
+    
+    def _detect(self, frame: npt.NDArray[np.uint8], conf: float = DEFAULT_CONFIDENCE,
+                imgsz: Optional[int] = None):
         """
         Execute optimized YOLO inference on input frame.
         
         Args:
             frame (npt.NDArray[np.uint8]): Input image array (H x W x C)
             conf (float): Confidence threshold for detections
+            imgsz (Optional[int]): Input size override, defaults to self.imgsz
             
         Returns:
             Detection results from YOLO model
@@ -98,6 +172,8 @@ class Detector:
         Note:
             Uses optimized parameters for maximum performance
         """
+        start: float = time.perf_counter()
+        
         # Use torch.no_grad() to save memory during inference
         with torch.no_grad():
             results = self.model(
@@ -108,30 +184,173 @@ class Detector:
                 half=self.half,
                 verbose=self.verbose,
                 max_det=self.max_det,
+                imgsz=imgsz or self.imgsz,
                 agnostic_nms=True,  # Faster NMS across all classes
             )[0]
         
+        self._m_detect.observe(time.perf_counter() - start)
+        self._m_batch.observe(1)
+        # Results.speed holds per-stage milliseconds measured by ultralytics itself
+        for stage, ms in (getattr(results, "speed", None) or {}).items():
+            series = self._m_stages.get(stage)
+            if series is not None and ms is not None:
+                series.observe(ms / 1000.0)
+        
+        return results
+    
+    def _detect_cascade(self, frame: npt.NDArray[np.uint8], source: str, conf: float = DEFAULT_CONFIDENCE):
+        """
+        Low-resolution first pass, escalating to a high-resolution pass only when needed.
+        
+        Escalation happens when a low-res score falls in the ambiguous band
+        [CASCADE_AMBIGUOUS_CONF, conf), when a confident person box is shorter
+        than CASCADE_MIN_BOX_HEIGHT of the frame, or when fewer people are seen
+        than in this source's previous frame (a tracked person shrank or was lost).
+        
+        Args:
+            frame (npt.NDArray[np.uint8]): Input image array (H x W x C)
+            source (str): Source name the per-source statistics are kept under
+            conf (float): Final confidence threshold
+            
+        Returns:
+            Detection results containing only boxes with score >= conf
+        """
+        stats: Optional[CascadeStats] = self.cascade_stats.get(source)
+        if stats is None:
+            stats = self.cascade_stats.setdefault(source, CascadeStats(source))
+        stats.frames += 1
+        stats._m_frames.inc()
+        
+        results = self._detect(frame, conf=min(CASCADE_AMBIGUOUS_CONF, conf), imgsz=self.low_imgsz)
+        boxes = results.boxes
+        scores = boxes.conf if boxes is not None else torch.zeros(0)
+        confident = scores >= conf
+        ambiguous = ~confident
+        small = confident & (boxes.xywhn[:, 3] < CASCADE_MIN_BOX_HEIGHT) if boxes is not None else confident
+        confident_count: int = int(confident.sum())
+        
+        reason: Optional[str] = None
+        if bool(ambiguous.any()):
+            reason = "ambiguous"
+        elif bool(small.any()):
+            reason = "small"
+        elif confident_count < stats.last_count:
+            reason = "lost"
+        
+        if reason is None:
+            results = results[confident]
+        else:
+            stats.escalations += 1
+            stats.reasons[reason] += 1
+            stats._m_escalations[reason].inc()
+            if self.cascade == "crop" and reason != "lost":
+                results = self._escalate_crop(frame, results, ambiguous | small, conf)
+            else:
+                results = self._detect(frame, conf=conf, imgsz=self.imgsz)
+        
+        stats.last_count = len(results.boxes) if results.boxes is not None else 0
         return results
     
-    def annotate(self, frame: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+    def _escalate_crop(self, frame: npt.NDArray[np.uint8], results, candidates, conf: float):
+        """Re-detect only the padded region around candidate boxes and merge with the confident low-res boxes."""
+        h, w = frame.shape[:2]
+        region = results.boxes.xyxy[candidates]
+        x1, y1 = region[:, 0].min().item(), region[:, 1].min().item()
+        x2, y2 = region[:, 2].max().item(), region[:, 3].max().item()
+        pad_x, pad_y = (x2 - x1) * CASCADE_CROP_MARGIN, (y2 - y1) * CASCADE_CROP_MARGIN
+        cx1, cy1 = max(int(x1 - pad_x), 0), max(int(y1 - pad_y), 0)
+        cx2, cy2 = min(int(x2 + pad_x) + 1, w), min(int(y2 + pad_y) + 1, h)
+        
+        # The crop is much smaller than the frame, so the low input size already gives high effective resolution
+        crop_results = self._detect(frame[cy1:cy2, cx1:cx2], conf=conf, imgsz=self.low_imgsz)
+        crop_data = crop_results.boxes.data[:, :6].clone()
+        crop_data[:, [0, 2]] += cx1
+        crop_data[:, [1, 3]] += cy1
+        
+        # Keep confident low-res boxes centred outside the re-detected region
+        kept = results.boxes.data[(results.boxes.conf >= conf) & ~candidates][:, :6]
+        centers_x = (kept[:, 0] + kept[:, 2]) / 2
+        centers_y = (kept[:, 1] + kept[:, 3]) / 2
+        outside = (centers_x < cx1) | (centers_x >= cx2) | (centers_y < cy1) | (centers_y >= cy2)
+        
+        merged = results.new()
+        merged.update(boxes=torch.cat([kept[outside], crop_data.to(kept.device)]))
+        return merged
+    
+    def _run(self, frame: npt.NDArray[np.uint8], source: Optional[str], track: bool = True):
+        """Dispatch to the cascade when enabled and tracking, otherwise a single pass at imgsz."""
+        if self.cascade is not None and track:
+            return self._detect_cascade(frame, source=source or "default")
+        return self._detect(frame=frame)
+    
+    def cascade_report(self) -> str:
+        """One line per source with frames, escalation rate and reasons."""
+        return "\n".join(
+            f"{name}: {stats.frames} frames, {stats.escalation_rate:.1%} escalated {stats.reasons}"
+            for name, stats in self.cascade_stats.items()
+        )
+    
+    def annotate(self, frame: npt.NDArray[np.uint8], source: Optional[str] = None,
+                 track: bool = True) -> npt.NDArray[np.uint8]:
         """
         Generate annotated frame with detection results.
         
         Args:
             frame (npt.NDArray[np.uint8]): Input image frame (H x W x C)
+            source (Optional[str]): Source name, used for per-source cascade statistics
+            track (bool): False for one-off frames such as full-resolution snapshots: a single
+                pass at imgsz that leaves the source's cascade state and detection events alone
             
         Returns:
             npt.NDArray[np.uint8]: Annotated frame with bounding boxes and labels
             
         Note:
-            Only prints detection count if objects are found to reduce I/O overhead
+            Detection counts go to the event bus (debounced per source), not stdout
         """
-        results = self._detect(frame=frame)
+        results = self._run(frame, source, track)
         
-        # Optimized detection logging - only print when detections exist
-        if results.boxes is not None and len(results.boxes) > 0:
-            print(f"[DETECTED] {len(results.boxes)} object(s)")
+        # Non-blocking, debounced detection event instead of a print per frame
+        if track:
+            EVENTS.detection(source or "default", len(results.boxes) if results.boxes is not None else 0)
         
         # Generate annotated frame efficiently
+        plot_start: float = time.perf_counter()
         annotated_frame: npt.NDArray[np.uint8] = results.plot()
+        self._m_stages["plot"].observe(time.perf_counter() - plot_start)
+        return annotated_frame
+
+    def annotate_scaled(self, frame: npt.NDArray[np.uint8], display: npt.NDArray[np.uint8],
+                        source: Optional[str] = None) -> npt.NDArray[np.uint8]:
+        """
+        Detect on a pre-scaled inference frame and draw the boxes on a display thumbnail.
+        
+        Used with VideoSource(inference_size=..., display_size=...) so that
+        neither inference nor drawing touches full-resolution pixels.
+        
+        Args:
+            frame (npt.NDArray[np.uint8]): Inference frame (longest side ~ imgsz)
+            display (npt.NDArray[np.uint8]): Display thumbnail of the same capture
+            source (Optional[str]): Source name, used for per-source cascade statistics
+            
+        Returns:
+            npt.NDArray[np.uint8]: Annotated copy of the display thumbnail
+        """
+        results = self._run(frame, source)
+        
+        EVENTS.detection(source or "default", len(results.boxes) if results.boxes is not None else 0)
+        
+        plot_start: float = time.perf_counter()
+        annotated_frame: npt.NDArray[np.uint8] = display.copy()
+        if results.boxes is not None and len(results.boxes) > 0:
+            # Boxes are in inference-frame pixels; scale each axis to the thumbnail
+            sx: float = display.shape[1] / frame.shape[1]
+            sy: float = display.shape[0] / frame.shape[0]
+            boxes = results.boxes.xyxy.cpu().numpy()
+            scores = results.boxes.conf.cpu().numpy()
+            for (x1, y1, x2, y2), score in zip(boxes, scores):
+                p1 = (int(x1 * sx), int(y1 * sy))
+                cv2.rectangle(annotated_frame, p1, (int(x2 * sx), int(y2 * sy)), BOX_COLOR, 2)
+                cv2.putText(annotated_frame, f"person {score:.2f}", (p1[0], max(p1[1] - 4, 10)),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.4, BOX_COLOR, 1, cv2.LINE_AA)
+        self._m_stages["plot"].observe(time.perf_counter() - plot_start)
         return annotated_frame
@@ -1,14 +1,54 @@
 from utils.VideoSourceHelper import VideoSourceHelper
 from utils.VideoManager import VideoManager
 
-from detector.Detector import Detector
-from Pipeline import Pipeline
-from typing import Final
+from detector.detector import Detector
+from pipeline import Pipeline
+from utils.Metrics import METRICS, MetricsServer, MetricsReporter
+from utils.EventBus import EVENTS, ConsoleHandler, JsonLinesHandler
+from utils.ResourceManager import RESOURCES, ResourceConfig
+from utils.VideoSource import VideoSource
+from utils.StreamServer import StreamServer
+from functools import partial
+from typing import Final, Optional, Tuple
 
 MODEL_PATH: Final[str] = "models/yolo11n.pt"
 VIDEO_FOLDER: Final[str] = "videos"
+INFERENCE_SIZE: Final[int] = 640                 # Tamaño de entrada del detector (imgsz)
+DISPLAY_SIZE: Final[Tuple[int, int]] = (400, 400)  # Miniatura por fuente en el grid (w, h)
+DETECTION_CASCADE: Final[Optional[str]] = None   # None, "resolution" o "crop"
+METRICS_ENABLED: Final[bool] = True
+METRICS_PORT: Final[int] = 9108
+METRICS_REPORT_INTERVAL: Final[float] = 30.0
+EVENT_LOG_PATH: Final[Optional[str]] = None  # Eventos estructurados en JSON lines, p. ej. "events.jsonl" (None = desactivado)
+# Hilos de torch/OpenCV y afinidad de nucleos: None deja los valores por defecto,
+# ResourceConfig.split(0.75) reparte 75% de los nucleos a inferencia y el resto a captura
+RESOURCE_CONFIG: Final[Optional[ResourceConfig]] = None
+AUTOTUNE_SECONDS: Final[Optional[float]] = None  # Segundos por configuracion para autoajuste (None = desactivado)
+# Streaming MJPEG del grid y de cada fuente (http://host:puerto/); None desactiva el servidor
+STREAM_PORT: Final[Optional[int]] = 8080
+STREAM_HOST: Final[str] = "127.0.0.1"            # "0.0.0.0" para operadores remotos
+STREAM_QUALITY: Final[int] = 75                  # Calidad JPEG 1-100
+STREAM_MAX_WIDTH: Final[Optional[int]] = None    # Reducir frames mas anchos antes de codificar
+STREAM_MAX_FPS: Final[Optional[float]] = 15.0
 
 def main() -> None:
+    # 0. Instrumentacion: endpoint Prometheus local + resumen periodico en log
+    metrics_server = MetricsServer(port=METRICS_PORT)
+    metrics_reporter = MetricsReporter(interval=METRICS_REPORT_INTERVAL)
+    if METRICS_ENABLED:
+        METRICS.enable()
+        metrics_server.start()
+        metrics_reporter.start()
+
+    # Bus de eventos asincrono: detecciones, estado de fuentes y controles fuera del hilo principal
+    EVENTS.add_handler(ConsoleHandler())
+    if EVENT_LOG_PATH:
+        EVENTS.add_handler(JsonLinesHandler(EVENT_LOG_PATH))
+    EVENTS.start()
+
+    if RESOURCE_CONFIG is not None:
+        RESOURCES.configure(RESOURCE_CONFIG)
+
     # 1. Obtener todas las fuentes de video disponibles (cámaras + archivos)
     sources = VideoSourceHelper.get_all_sources(VIDEO_FOLDER)
     print(f"Sources found: {sources}")
@@ -18,23 +58,41 @@ def main() -> None:
         return
 
     # 2. Inicializar VideoManager con las fuentes
-    video_manager: VideoManager = VideoManager(sources=sources,video_folder=VIDEO_FOLDER)
+    #    Cada fuente genera, una vez por captura, el frame de inferencia y la miniatura del grid
+    source_factory = partial(VideoSource, inference_size=INFERENCE_SIZE, display_size=DISPLAY_SIZE)
+    video_manager: VideoManager = VideoManager(sources=sources,video_folder=VIDEO_FOLDER,
+                                               source_factory=source_factory)
 
     # 3. Iniciar cámaras / videos
     video_manager.start_all()
+    print(f"[INFO] Startup:\n{video_manager.startup_report()}")
 
     # 4. Inicializar detector
-    detector = Detector(model_path=MODEL_PATH)
+    detector = Detector(model_path=MODEL_PATH, imgsz=INFERENCE_SIZE, cascade=DETECTION_CASCADE)
 
     # 5. Inicializar pipeline sin heatmap
+    #    El servidor solo codifica las vistas que algun cliente esta mirando
+    stream_server: Optional[StreamServer] = None
+    if STREAM_PORT is not None:
+        stream_server = StreamServer(host=STREAM_HOST, port=STREAM_PORT, quality=STREAM_QUALITY,
+                                     max_width=STREAM_MAX_WIDTH, max_fps=STREAM_MAX_FPS)
+        try:
+            stream_server.start()
+        except OSError as e:
+            print(f"[ERROR] Streaming disabled, cannot listen on port {STREAM_PORT}: {e}")
+            stream_server = None
     pipeline: Pipeline = Pipeline(
         manager=video_manager,
         detector=detector,
-        grid=True
+        grid=True,
+        stream=stream_server
     )
 
     # 6. Ejecutar pipeline
     try:
+        if AUTOTUNE_SECONDS:
+            # Barrido de configuraciones contra la carga real antes de mostrar el grid
+            RESOURCES.autotune(pipeline.process_fresh, seconds=AUTOTUNE_SECONDS)
         pipeline.run()
     except KeyboardInterrupt:
         print("\n[INFO] Pipeline interrumpido por el usuario.")
@@ -42,6 +100,13 @@ def main() -> None:
         # 7. Detener todas las fuentes
         video_manager.stop_all()
         print("[INFO] Todas las fuentes de video detenidas.")
+        if detector.cascade is not None:
+            print(f"[INFO] Cascada:\n{detector.cascade_report()}")
+        if stream_server is not None:
+            stream_server.stop()
+        metrics_reporter.stop()
+        metrics_server.stop()
+        EVENTS.stop()
 
 if __name__ == "__main__":
     main()
@@ -2,65 +2,102 @@ import cv2 as cv
 import numpy as np
 import time
 import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple, TYPE_CHECKING
 import numpy.typing as npt
 from utils.VideoManager import VideoManager
-from detector.Detector import Detector
+from utils.VideoSource import FrameBundle
 from PIL import Image
+from utils.Metrics import METRICS
+from utils.EventBus import EVENTS, CONTROL
+from utils.StreamServer import StreamServer, GRID_STREAM
+
+if TYPE_CHECKING:
+    # Only for annotations: importing it pulls in torch/ultralytics, which StubDetector runs must not need
+    from detector.detector import Detector
+
+_LOOP_SECONDS = METRICS.histogram("pipeline_loop_seconds", "Work time of one Pipeline.run iteration, excluding pacing sleep")
+_STAGE_SECONDS = METRICS.histogram("pipeline_stage_seconds", "Pipeline time per stage (read/detect/render)")
 
 class Pipeline:
     """Handles multiple video sources with optional detection and dynamic restart."""
 
-    def __init__(self, manager: VideoManager, detector: Optional[Detector] = None, grid: bool = False) -> None:
+    def __init__(self, manager: VideoManager, detector: Optional["Detector"] = None, grid: bool = False,
+                 stream: Optional[StreamServer] = None, display: bool = True) -> None:
         self.manager: VideoManager = manager
-        self.detector: Optional[Detector] = detector
+        self.detector: Optional["Detector"] = detector
         self.grid: bool = grid
+        self.stream: Optional[StreamServer] = stream  # MJPEG views for remote operators
+        self.display: bool = display  # False: no local windows (and no keyboard controls), e.g. streaming only
         self.grid_size: tuple[int, int] = (400, 400)
         self.cols: int = 4
         self.enable_detection: bool = True
+        # Capture time of each frame returned by the last process_sources() call
+        self.frame_times: Dict[str, float] = {}
+        # Frames read by the last process_sources() call at every resolution, for full-res snapshots
+        self.last_bundles: Dict[str, FrameBundle] = {}
+        # Seconds spent reading + detecting new frames, and how many, per source since the caller
+        # last cleared them; seconds / frames * capture fps is the load a source puts on this loop
+        self.source_seconds: Dict[str, float] = {}
+        self.source_frames: Dict[str, int] = {}
+        # Reuse a source's last output until it captures a new frame; False re-detects on every call
+        self.reuse_outputs: bool = True
+        # Last output per source as (capture time, detection enabled, frame)
+        self._last_output: Dict[str, Tuple[float, bool, npt.NDArray[np.uint8]]] = {}
+        # Last composed grid and the frames it was built from, reused while none of them changes
+        self._last_grid: Optional[Tuple[List[Tuple[str, npt.NDArray[np.uint8]]], npt.NDArray[np.uint8]]] = None
+        self._m_loop = _LOOP_SECONDS.labels()
+        self._m_read = _STAGE_SECONDS.labels(stage="read")
+        self._m_detect = _STAGE_SECONDS.labels(stage="detect")
+        self._m_render = _STAGE_SECONDS.labels(stage="render")
 
     def run(self) -> None:
-        print("[Controls] q: quit, s: save frame, d: toggle detection, r: restart sources")
+        if self.display:
+            print("[Controls] q: quit, s: save frame, d: toggle detection, r: restart sources")
 
         loop_fps: int = 30
         last_time: float = time.time()
 
         while True:
-            frames_out: Dict[str, npt.NDArray[np.uint8]] = {}
-            any_frame: bool = False
-
-            active_sources = self.manager.get_active_sources()
-            for source in active_sources:
-                frame: Optional[npt.NDArray[np.uint8]] = source.read()
-                if frame is None:
-                    continue
-
-                any_frame = True
-                if self.detector and self.enable_detection:
-                    frame = self.detector.annotate(frame)
-
-                frames_out[source.name] = frame
+            loop_start: float = time.perf_counter()
+            frames_out = self.process_sources()
+            any_frame: bool = bool(frames_out)
 
             if not any_frame and not self.grid:
                 print("[INFO] No active video sources remain. Exiting.")
                 break
 
-            if self.grid:
-                self._show_grid(frames_out)
-            else:
+            render_start: float = time.perf_counter()
+            stream_grid: bool = self.stream is not None and self.stream.wants(GRID_STREAM)
+            # Composed once, for the local window and the stream alike
+            grid_frame: Optional[npt.NDArray[np.uint8]] = (
+                self._grid(frames_out) if (self.grid and self.display) or stream_grid else None
+            )
+            if self.display:
+                if self.grid:
+                    cv.imshow("Grid", grid_frame)
+                else:
+                    for name, frame in frames_out.items():
+                        cv.imshow(name, frame)
+            if self.stream is not None:
                 for name, frame in frames_out.items():
-                    cv.imshow(name, frame)
+                    self.stream.publish(name, frame)
+                if stream_grid:
+                    self.stream.publish(GRID_STREAM, grid_frame)
 
-            key: int = cv.waitKey(1) & 0xFF
+            key: int = cv.waitKey(1) & 0xFF if self.display else 0xFF
+            self._m_render.observe(time.perf_counter() - render_start)
+            self._m_loop.observe(time.perf_counter() - loop_start)
             if key == ord("q"):
+                EVENTS.emit(CONTROL, "pipeline", action="quit")
                 break
             elif key == ord("s"):
-                self._save_frames(frames_out)
+                self._save_frames(self.last_bundles)
             elif key == ord("d"):
                 self.enable_detection = not self.enable_detection
-                print(f"[INFO] Detection {'ENABLED' if self.enable_detection else 'DISABLED'}")
+                EVENTS.emit(CONTROL, "pipeline", action="detection", enabled=self.enable_detection)
             elif key == ord("r"):
                 # Dynamic restart
+                EVENTS.emit(CONTROL, "pipeline", action="restart sources")
                 self.manager.restart_sources()
 
             elapsed: float = time.time() - last_time
@@ -70,17 +107,96 @@ class Pipeline:
             last_time = time.time()
 
         self.manager.stop_all()
-        cv.destroyAllWindows()
-
-    def _show_grid(self, frames: Dict[str, npt.NDArray[np.uint8]]) -> None:
+        if self.display:
+            cv.destroyAllWindows()
+
+    def process_sources(self) -> Dict[str, npt.NDArray[np.uint8]]:
+        """
+        Read the latest frame of every active source and annotate it.
+
+        Sources that produce inference/display frames (VideoSource inference_size
+        and display_size) are detected and drawn at those sizes; the full
+        resolution frame is only used when a source does not provide them.
+        This is the display-free part of one run() iteration, also driven
+        directly by the benchmarks.
+
+        A source that has not captured since the previous call returns its
+        previous output without being detected again.
+        """
+        frames_out: Dict[str, npt.NDArray[np.uint8]] = {}
+        self.frame_times = {}
+        self.last_bundles = {}
+        last_output, self._last_output = self._last_output, {}
+        detect: bool = bool(self.detector) and self.enable_detection
+
+        for source in self.manager.get_active_sources():
+            source_start: float = time.perf_counter()
+            bundle: Optional[FrameBundle] = source.read_bundle()
+            self._m_read.observe(time.perf_counter() - source_start)
+            if bundle is None:
+                continue
+
+            previous = last_output.get(source.name)
+            if (self.reuse_outputs and previous is not None
+                    and previous[0] == bundle.capture_time and previous[1] == detect):
+                frames_out[source.name] = previous[2]
+                self.frame_times[source.name] = bundle.capture_time
+                self.last_bundles[source.name] = bundle
+                self._last_output[source.name] = previous
+                continue
+
+            if detect:
+                t0 = time.perf_counter()
+                if bundle.inference is not None and bundle.display is not None:
+                    frame = self.detector.annotate_scaled(bundle.inference, bundle.display, source=source.name)
+                else:
+                    frame = self.detector.annotate(bundle.full, source=source.name)
+                self._m_detect.observe(time.perf_counter() - t0)
+            else:
+                frame = bundle.display if bundle.display is not None else bundle.full
+
+            frames_out[source.name] = frame
+            self.frame_times[source.name] = bundle.capture_time
+            self.last_bundles[source.name] = bundle
+            self._last_output[source.name] = (bundle.capture_time, detect, frame)
+            self.source_seconds[source.name] = (
+                self.source_seconds.get(source.name, 0.0) + time.perf_counter() - source_start
+            )
+            self.source_frames[source.name] = self.source_frames.get(source.name, 0) + 1
+
+        return frames_out
+
+    def process_fresh(self) -> int:
+        """
+        Run process_sources() and return how many of its frames are new since the previous call.
+
+        Throughput unit for RESOURCES.autotune(): frames re-read from a source
+        that has not captured since do not count.
+        """
+        previous: Dict[str, float] = self.frame_times
+        self.process_sources()
+        return sum(1 for name, frame_time in self.frame_times.items() if previous.get(name) != frame_time)
+
+    def _grid(self, frames: Dict[str, npt.NDArray[np.uint8]]) -> npt.NDArray[np.uint8]:
+        """The composed grid, the same array as last time while no source has a new output."""
+        items: List[Tuple[str, npt.NDArray[np.uint8]]] = list(frames.items())
+        if self._last_grid is not None:
+            previous, grid = self._last_grid
+            if len(previous) == len(items) and all(
+                    name == old_name and frame is old_frame
+                    for (name, frame), (old_name, old_frame) in zip(items, previous)):
+                return grid  # Unchanged, so the stream server does not encode it again
+        grid = self._compose_grid(frames)
+        self._last_grid = (items, grid)
+        return grid
+
+    def _compose_grid(self, frames: Dict[str, npt.NDArray[np.uint8]]) -> npt.NDArray[np.uint8]:
         if not frames:
-            empty_grid = np.zeros((self.grid_size[0], self.cols * self.grid_size[1], 3), dtype=np.uint8)
-            cv.imshow("Grid", empty_grid)
-            return
+            return np.zeros((self.grid_size[0], self.cols * self.grid_size[1], 3), dtype=np.uint8)
 
         h, w = self.grid_size
         resized_frames: list[npt.NDArray[np.uint8]] = [
-            cv.resize(frame, (w, h), interpolation=cv.INTER_LINEAR)
+            frame if frame.shape[:2] == (h, w) else cv.resize(frame, (w, h), interpolation=cv.INTER_LINEAR)
             for frame in frames.values()
         ]
         rows: int = (len(resized_frames) + self.cols - 1) // self.cols
@@ -89,12 +205,16 @@ class Pipeline:
         row_imgs: list[npt.NDArray[np.uint8]] = [
             np.hstack(resized_frames[i * self.cols:(i + 1) * self.cols]) for i in range(rows)
         ]
-        grid_frame: npt.NDArray[np.uint8] = np.vstack(row_imgs)
-        cv.imshow("Grid", grid_frame)
+        return np.vstack(row_imgs)
 
-    def _save_frames(self, frames: Dict[str, npt.NDArray[np.uint8]]) -> None:
+    def _save_frames(self, bundles: Dict[str, FrameBundle]) -> None:
+        """Save full-resolution snapshots, annotated when detection is enabled."""
         timestamp: str = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        for name, frame in frames.items():
+        for name, bundle in bundles.items():
+            frame: npt.NDArray[np.uint8] = bundle.full
+            if self.detector and self.enable_detection:
+                # Untracked: a full-res one-off must not feed the source's cascade state or events
+                frame = self.detector.annotate(frame, source=name, track=False)
             rgb_frame: npt.NDArray[np.uint8] = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
             Image.fromarray(rgb_frame).save(f"frame_{name}_{timestamp}.png")
-            print(f"[INFO] Frame saved: frame_{name}_{timestamp}.png")
+            EVENTS.emit(CONTROL, name, action="frame saved", path=f"frame_{name}_{timestamp}.png")
@@ -0,0 +1,140 @@
+import socket
+import time
+
+import pytest
+
+from cluster.Coordinator import Coordinator, plan_assignment
+from cluster.Protocol import Connection, parse_address
+
+
+def _loads(assignment, costs, capacities):
+    load = {node: 0.0 for node in capacities}
+    for source, node in assignment.items():
+        load[node] += costs[source]
+    return {node: load[node] / capacities[node] for node in capacities}
+
+
+def test_plan_places_every_source_by_cost():
+    costs = {"a": 0.4, "b": 0.1, "c": 0.1, "d": 0.1, "e": 0.1}
+    assignment = plan_assignment(costs, {"n1": 1.0, "n2": 1.0}, current={})
+    assert set(assignment) == set(costs)
+    # The expensive source alone balances the four cheap ones
+    assert [s for s, n in assignment.items() if n == assignment["a"]] == ["a"]
+
+
+def test_plan_respects_capacity():
+    costs = {f"s{i}": 0.1 for i in range(9)}
+    assignment = plan_assignment(costs, {"big": 2.0, "small": 1.0}, current={})
+    assert sum(1 for n in assignment.values() if n == "big") == 6
+
+
+def test_plan_keeps_balanced_assignment():
+    costs = {"a": 1.0, "b": 1.0, "c": 1.0, "d": 1.0}
+    current = {"a": "n1", "b": "n1", "c": "n2", "d": "n2"}
+    assert plan_assignment(costs, {"n1": 1.0, "n2": 1.0}, current) == current
+
+
+def test_plan_moves_a_bounded_number_of_sources_to_a_new_node():
+    costs = {f"s{i}": 0.1 for i in range(6)}
+    current = {s: "n1" for s in costs}
+    assignment = plan_assignment(costs, {"n1": 1.0, "n2": 1.0}, current, max_moves=2)
+    assert sum(1 for n in assignment.values() if n == "n2") == 2
+
+
+def test_plan_does_not_move_pinned_sources():
+    costs = {"a": 0.5, "b": 0.5}
+    current = {"a": "n1", "b": "n1"}
+    assignment = plan_assignment(costs, {"n1": 1.0, "n2": 1.0}, current, pinned={"a", "b"})
+    assert assignment == current
+
+
+def test_plan_does_not_oscillate_on_indivisible_load():
+    costs = {"a": 1.0, "b": 1.0, "c": 1.0}
+    current = {"a": "n1", "b": "n1", "c": "n2"}
+    assert plan_assignment(costs, {"n1": 1.0, "n2": 1.0}, current) == current
+
+
+def test_plan_reassigns_sources_of_dead_nodes_and_drops_removed_sources():
+    costs = {"a": 0.1, "b": 0.1}
+    current = {"a": "dead", "b": "n1", "gone": "n1"}
+    assignment = plan_assignment(costs, {"n1": 1.0, "n2": 1.0}, current)
+    assert set(assignment) == {"a", "b"}
+    assert set(assignment.values()) <= {"n1", "n2"}
+
+
+def test_plan_tells_saturated_nodes_apart():
+    # Costs are per-source demand, so a node with more sources reports a higher load and sheds some
+    costs = {f"s{i}": 0.15 for i in range(20)}
+    current = {s: ("n1" if i < 16 else "n2") for i, s in enumerate(costs)}
+    capacities = {"n1": 1.0, "n2": 1.0}
+    for _ in range(5):
+        current = plan_assignment(costs, capacities, current)
+    loads = _loads(current, costs, capacities)
+    assert abs(loads["n1"] - loads["n2"]) < 0.2
+
+
+def test_plan_without_nodes_is_empty():
+    assert plan_assignment({"a": 1.0}, {}, {"a": "n1"}) == {}
+
+
+def test_parse_address():
+    assert parse_address("10.0.0.2:9300") == ("10.0.0.2", 9300)
+    assert parse_address("coordinator") == ("coordinator", 9200)
+
+
+def test_protocol_round_trip_and_eof():
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        a = Connection.connect(server.getsockname())
+        b = Connection(server.accept()[0])
+    try:
+        a.send({"type": "report", "costs": {"Source 0": 0.25}})
+        a.send({"type": "hello", "node": "w1"})
+        assert b.recv() == {"type": "report", "costs": {"Source 0": 0.25}}
+        assert b.recv()["node"] == "w1"
+        a.close()
+        assert b.recv() is None
+    finally:
+        b.close()
+
+
+def _hello(port, node, capacity=1.0):
+    conn = Connection.connect(("127.0.0.1", port))
+    conn.send({"type": "hello", "node": node, "capacity": capacity})
+    return conn
+
+
+@pytest.fixture
+def coordinator():
+    coord = Coordinator({f"Source {i}": i for i in range(5)}, port=0)
+    coord.start()
+    yield coord
+    coord.stop()
+
+
+def test_coordinator_shares_sources_and_reassigns_on_disconnect(coordinator):
+    w1 = _hello(coordinator.port, "w1")
+    assert len(w1.recv()["sources"]) == 5
+
+    w2 = _hello(coordinator.port, "w2")
+    moved = w2.recv()["sources"]
+    assert moved
+    assert len(w1.recv()["sources"]) == 5 - len(moved)
+
+    w2.close()
+    assert len(w1.recv()["sources"]) == 5
+    w1.close()
+
+
+def test_coordinator_aggregates_reports(coordinator):
+    w1 = _hello(coordinator.port, "w1")
+    w1.recv()
+    w1.send({"type": "report", "node": "w1", "load": 0.3, "costs": {"Source 0": 0.3},
+             "active": ["Source 0"], "failed": {}, "detections": {"Source 0": 2}, "events": []})
+    deadline = time.monotonic() + 2.0
+    while "Source 0" not in coordinator.status()["costs"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    status = coordinator.status()
+    assert status["costs"]["Source 0"] == pytest.approx(0.3)
+    assert status["detections"]["Source 0"]["count"] == 2
+    assert status["nodes"]["w1"]["load"] == pytest.approx(0.3)
+    w1.close()
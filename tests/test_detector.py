@@ -0,0 +1,126 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+pytest.importorskip("ultralytics")
+
+from ultralytics.engine.results import Results  # noqa: E402
+
+from detector.detector import BOX_COLOR, CASCADE_AMBIGUOUS_CONF, DEFAULT_CONFIDENCE, Detector  # noqa: E402
+
+
+def _results(frame, *boxes):
+    """Results with person boxes given as (x1, y1, x2, y2, score) in frame pixels."""
+    data = torch.tensor([[*box, 0.0] for box in boxes], dtype=torch.float32).reshape(-1, 6)
+    return Results(frame, path="", names={0: "person"}, boxes=data)
+
+
+class _FakeDetector(Detector):
+    """Detector without a model: _detect returns scripted passes and records how it was called."""
+
+    def __init__(self, passes, cascade="resolution"):
+        self.imgsz, self.low_imgsz = 640, 320
+        self.cascade = cascade
+        self.cascade_stats = {}
+        self._bind_metrics()
+        self.passes = list(passes)
+        self.calls = []
+
+    def _detect(self, frame, conf=DEFAULT_CONFIDENCE, imgsz=None):
+        self.calls.append((frame.shape[:2], conf, imgsz or self.imgsz))
+        return self.passes.pop(0)(frame)
+
+
+FRAME = np.zeros((1000, 1000, 3), dtype=np.uint8)
+PERSON = (100, 100, 300, 600, 0.9)  # Confident and half the frame tall
+
+
+def test_confident_large_boxes_stay_at_low_res():
+    detector = _FakeDetector([lambda f: _results(f, PERSON)])
+    results = detector._detect_cascade(FRAME, "cam")
+    assert detector.calls == [((1000, 1000), CASCADE_AMBIGUOUS_CONF, 320)]
+    assert len(results.boxes) == 1
+    stats = detector.cascade_stats["cam"]
+    assert (stats.frames, stats.escalations, stats.last_count) == (1, 0, 1)
+
+
+@pytest.mark.parametrize("low_pass, reason", [
+    ((PERSON, (600, 100, 800, 600, 0.3)), "ambiguous"),
+    (((100, 100, 150, 180, 0.9),), "small"),
+])
+def test_escalates_to_full_resolution(low_pass, reason):
+    high = _results(FRAME, PERSON, (600, 100, 800, 600, 0.8))
+    detector = _FakeDetector([lambda f: _results(f, *low_pass), lambda f: high])
+    results = detector._detect_cascade(FRAME, "cam")
+    assert detector.calls[1] == ((1000, 1000), DEFAULT_CONFIDENCE, 640)
+    assert results is high
+    stats = detector.cascade_stats["cam"]
+    assert stats.escalations == 1 and stats.reasons[reason] == 1
+    assert stats.last_count == 2
+
+
+def test_losing_a_tracked_person_escalates():
+    two = lambda f: _results(f, PERSON, (600, 100, 800, 600, 0.9))
+    detector = _FakeDetector([two, lambda f: _results(f, PERSON), two])
+    detector._detect_cascade(FRAME, "cam")
+    detector._detect_cascade(FRAME, "cam")
+    stats = detector.cascade_stats["cam"]
+    assert stats.reasons["lost"] == 1
+    assert stats.last_count == 2
+    assert detector.cascade_stats["cam"].escalation_rate == 0.5
+
+
+def test_stats_are_kept_per_source():
+    detector = _FakeDetector([lambda f: _results(f, PERSON, PERSON), lambda f: _results(f, PERSON)])
+    detector._detect_cascade(FRAME, "a")
+    detector._detect_cascade(FRAME, "b")  # Fewer people than source a, but b had none before
+    assert detector.cascade_stats["b"].escalations == 0
+
+
+def test_crop_escalation_redetects_the_region_and_merges_boxes():
+    candidate = (600, 400, 800, 600, 0.3)
+    crop_box = (10, 20, 110, 220, 0.8)  # In crop pixels
+    detector = _FakeDetector([lambda f: _results(f, PERSON, candidate), lambda f: _results(f, crop_box)],
+                             cascade="crop")
+    results = detector._detect_cascade(FRAME, "cam")
+    # Candidate region padded by 25% per axis: x 550-851, y 350-651, re-detected at the low input size
+    assert detector.calls[1] == ((301, 301), DEFAULT_CONFIDENCE, 320)
+    merged = results.boxes.data[:, :5].tolist()
+    assert merged == [pytest.approx(list(PERSON)), pytest.approx([560, 370, 660, 570, 0.8])]
+    assert detector.cascade_stats["cam"].reasons["ambiguous"] == 1
+
+
+def test_crop_escalation_drops_low_res_boxes_inside_the_region():
+    inside = (640, 420, 700, 560, 0.9)  # Confident, but centred in the re-detected region
+    detector = _FakeDetector([lambda f: _results(f, inside, (600, 400, 800, 600, 0.3)),
+                              lambda f: _results(f)], cascade="crop")
+    assert len(detector._detect_cascade(FRAME, "cam").boxes) == 0
+
+
+def test_lost_person_in_crop_mode_reruns_the_whole_frame():
+    two = lambda f: _results(f, PERSON, (600, 100, 800, 600, 0.9))
+    detector = _FakeDetector([two, lambda f: _results(f, PERSON), two], cascade="crop")
+    detector._detect_cascade(FRAME, "cam")
+    detector._detect_cascade(FRAME, "cam")
+    assert detector.calls[-1] == ((1000, 1000), DEFAULT_CONFIDENCE, 640)
+
+
+def test_untracked_annotate_bypasses_the_cascade():
+    detector = _FakeDetector([lambda f: _results(f, PERSON)])
+    detector.annotate(FRAME, source="cam", track=False)
+    assert detector.calls == [((1000, 1000), DEFAULT_CONFIDENCE, 640)]
+    assert "cam" not in detector.cascade_stats
+
+
+def test_annotate_scaled_maps_boxes_from_the_inference_frame_onto_the_thumbnail():
+    inference = np.zeros((360, 640, 3), dtype=np.uint8)
+    display = np.zeros((400, 400, 3), dtype=np.uint8)
+    detector = _FakeDetector([lambda f: _results(f, (64, 36, 320, 180, 0.9))], cascade=None)
+    annotated = detector.annotate_scaled(inference, display, source="cam")
+    assert detector.calls == [((360, 640), DEFAULT_CONFIDENCE, 640)]
+    assert annotated.shape == display.shape and not display.any()
+    # x scales by 400/640 and y by 400/360: (64, 36)-(320, 180) becomes (40, 40)-(200, 200)
+    green = np.array(BOX_COLOR, dtype=np.uint8)
+    for y, x in ((120, 40), (120, 200), (200, 120)):
+        assert (annotated[y, x] == green).all()
+    assert not annotated[120, 120].any() and not annotated[120, 210].any()
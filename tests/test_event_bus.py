@@ -0,0 +1,42 @@
+import time
+
+from utils.EventBus import DETECTION, EventBus, EventHandler
+
+
+class _Collect(EventHandler):
+    def __init__(self):
+        self.events = []
+
+    def handle(self, event):
+        self.events.append(event)
+
+
+def _bus(**kwargs):
+    bus = EventBus(**kwargs)
+    handler = _Collect()
+    bus.add_handler(handler)
+    bus.start()
+    return bus, handler
+
+
+def test_detection_is_debounced_to_count_changes():
+    bus, handler = _bus(presence_interval=60.0)
+    for count in (0, 1, 1, 1, 2, 0, 0):
+        bus.detection("cam", count)
+    bus.stop()
+    assert [e.data["count"] for e in handler.events if e.kind == DETECTION] == [1, 2, 0]
+
+
+def test_rate_limited_change_is_delivered_later():
+    bus, handler = _bus(rate=10.0, burst=1.0, presence_interval=60.0)
+    bus.detection("cam", 3)
+    bus.detection("cam", 0)  # Dropped by the token bucket
+    time.sleep(0.2)
+    bus.detection("cam", 0)  # Retried once tokens are back
+    bus.stop()
+    assert [e.data["count"] for e in handler.events] == [3, 0]
+
+
+def test_emit_without_handlers_is_dropped_silently():
+    bus = EventBus()
+    assert bus.emit(DETECTION, "cam", count=1) is False
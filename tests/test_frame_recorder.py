@@ -0,0 +1,70 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils.FrameRecorder import FrameRecorder, RawFrameFile  # noqa: E402
+
+
+def _frames(count, height=4, width=6, channels=3):
+    return [np.full((height, width, channels), i, dtype=np.uint8) for i in range(count)]
+
+
+def test_round_trip_preserves_frames_and_relative_timestamps(tmp_path):
+    path = str(tmp_path / "clip.rawframes")
+    with FrameRecorder(path, fps=25.0) as recorder:
+        for i, frame in enumerate(_frames(5)):
+            recorder.append(frame, 100.0 + i * 0.04)
+
+    recording = RawFrameFile(path)
+    try:
+        assert len(recording) == 5
+        assert (recording.width, recording.height, recording.channels) == (6, 4, 3)
+        assert recording.fps == 25.0
+        np.testing.assert_allclose(recording.timestamps, [0.0, 0.04, 0.08, 0.12, 0.16])
+        for i in range(5):
+            frame, _ = recording.frame(i)
+            assert (frame == i).all()
+    finally:
+        recording.close()
+
+
+def test_max_frames_and_grayscale(tmp_path):
+    path = str(tmp_path / "gray.rawframes")
+    recorder = FrameRecorder(path, max_frames=3)
+    for frame in _frames(5, channels=1):
+        recorder.append(frame[:, :, 0])
+    assert recorder.full
+    recorder.close()
+    assert recorder.frame_count == 3
+
+    recording = RawFrameFile(path)
+    assert len(recording) == 3 and recording.channels == 1
+    recording.close()
+
+
+def test_shape_change_is_rejected(tmp_path):
+    recorder = FrameRecorder(str(tmp_path / "bad.rawframes"))
+    recorder.append(np.zeros((4, 6, 3), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        recorder.append(np.zeros((8, 6, 3), dtype=np.uint8))
+    recorder.close()
+
+
+def test_truncated_recording_is_readable_up_to_last_complete_frame(tmp_path):
+    path = tmp_path / "cut.rawframes"
+    with FrameRecorder(str(path)) as recorder:
+        for frame in _frames(4):
+            recorder.append(frame)
+    data = path.read_bytes()
+    path.write_bytes(data[:-10])  # Last record cut short, header still claims 4
+
+    recording = RawFrameFile(str(path))
+    assert len(recording) == 3
+    recording.close()
+
+
+def test_bad_magic_is_rejected(tmp_path):
+    path = tmp_path / "junk.rawframes"
+    path.write_bytes(b"x" * 128)
+    with pytest.raises(ValueError):
+        RawFrameFile(str(path))
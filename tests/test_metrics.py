@@ -0,0 +1,40 @@
+from utils.Metrics import MetricsRegistry
+
+
+def _registry():
+    registry = MetricsRegistry()
+    registry.enable()
+    return registry
+
+
+def test_histogram_exposition_is_cumulative():
+    registry = _registry()
+    histogram = registry.histogram("stage_seconds", "Stage time", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.labels(stage="read").observe(value)
+    text = registry.render_prometheus()
+    assert '# TYPE stage_seconds histogram' in text
+    assert 'stage_seconds_bucket{stage="read",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="read",le="1.0"} 2' in text
+    assert 'stage_seconds_bucket{stage="read",le="+Inf"} 3' in text
+    assert 'stage_seconds_count{stage="read"} 3' in text
+
+
+def test_counter_type_line_names_the_total_samples():
+    registry = _registry()
+    registry.counter("frames", "Frames").labels().inc()
+    lines = registry.render_prometheus().splitlines()
+    assert lines == ["# HELP frames_total Frames", "# TYPE frames_total counter", "frames_total 1.0"]
+
+
+def test_label_values_are_escaped():
+    registry = _registry()
+    registry.counter("frames", "Frames").labels(source='C:\\videos\\"lobby"\n').inc()
+    assert 'frames_total{source="C:\\\\videos\\\\\\"lobby\\"\\n"} 1.0' in registry.render_prometheus()
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry()
+    counter = registry.counter("frames", "Frames").labels()
+    counter.inc()
+    assert counter.value() == 0.0
@@ -0,0 +1,77 @@
+import os
+import threading
+
+import pytest
+
+from utils.ResourceManager import AFFINITY_SUPPORTED, ResourceConfig, ResourceManager
+
+
+def test_split_gives_inference_the_first_cores_and_one_torch_thread_each():
+    config = ResourceConfig.split(0.75, cores=[0, 1, 2, 3], opencv_threads=-1)
+    assert config.inference_cores == frozenset({0, 1, 2})
+    assert config.capture_cores == frozenset({3})
+    assert config.torch_threads == 3
+    assert config.opencv_threads == -1
+
+
+def test_split_keeps_at_least_one_core_on_each_side():
+    assert ResourceConfig.split(0.1, cores=[0, 1, 2, 3]).inference_cores == frozenset({0})
+    single = ResourceConfig.split(0.75, cores=[5])
+    assert single.inference_cores == single.capture_cores == frozenset({5})
+
+
+def test_default_candidates_start_with_the_untouched_layout_and_are_unique():
+    candidates = ResourceManager.default_candidates(cores=[0, 1, 2, 3])
+    assert candidates[0] == ResourceConfig()
+    assert len(candidates) == len(set(candidates))
+    assert {c.inference_cores for c in candidates[1:]} == {
+        frozenset({0}), frozenset({0, 1}), frozenset({0, 1, 2})}
+    assert {c.opencv_threads for c in candidates[1:]} == {0, -1}
+
+
+def test_default_candidates_on_one_core():
+    assert ResourceManager.default_candidates(cores=[0]) == [
+        ResourceConfig(), ResourceConfig(torch_threads=1, opencv_threads=0)]
+
+
+@pytest.fixture
+def opencv_threads():
+    cv2 = pytest.importorskip("cv2")
+    original = cv2.getNumThreads()
+    yield cv2
+    cv2.setNumThreads(original)
+
+
+def test_autotune_keeps_the_fastest_candidate(opencv_threads):
+    manager = ResourceManager()
+    candidates = [ResourceConfig(opencv_threads=1), ResourceConfig(opencv_threads=2), ResourceConfig(opencv_threads=3)]
+    best = manager.autotune(lambda: 5 if manager.config.opencv_threads == 2 else 1,
+                            candidates=candidates, seconds=0.05, warmup=0.0)
+    assert best == candidates[1]
+    assert manager.config == candidates[1]
+    assert opencv_threads.getNumThreads() == 2
+
+
+def test_untouched_winner_restores_the_original_thread_counts(opencv_threads):
+    cv2 = opencv_threads
+    cv2.setNumThreads(1)
+    manager = ResourceManager()
+    candidates = [ResourceConfig(), ResourceConfig(opencv_threads=3)]
+    best = manager.autotune(lambda: 5 if manager.config.opencv_threads is None else 1,
+                            candidates=candidates, seconds=0.05, warmup=0.0)
+    assert best == ResourceConfig()
+    assert cv2.getNumThreads() == 1
+
+
+@pytest.mark.skipif(not AFFINITY_SUPPORTED or not os.path.isdir("/proc/self/task"), reason="Linux only")
+def test_python_threads_are_never_treated_as_the_inference_pool():
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait, daemon=True)
+    thread.start()
+    try:
+        pool = ResourceManager._pool_tids(os.sched_getaffinity(0))
+        assert threading.get_native_id() not in pool
+        assert thread.native_id not in pool
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,127 @@
+import socket
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from utils.StreamServer import StreamServer  # noqa: E402
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+class _Client:
+    """Minimal MJPEG client reading multipart parts off a real socket."""
+
+    def __init__(self, port, name, rcvbuf=None):
+        self.sock = socket.socket()
+        if rcvbuf is not None:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        self.sock.connect(("127.0.0.1", port))
+        self.sock.settimeout(5.0)
+        self.sock.sendall(f"GET /stream/{name} HTTP/1.1\r\n\r\n".encode())
+        self.buffer = b""
+        assert self._read_until(b"\r\n\r\n").startswith(b"HTTP/1.1 200")
+
+    def _read_until(self, marker):
+        while marker not in self.buffer:
+            chunk = self.sock.recv(65536)
+            assert chunk, "connection closed"
+            self.buffer += chunk
+        head, self.buffer = self.buffer.split(marker, 1)
+        return head
+
+    def frame(self):
+        headers = self._read_until(b"\r\n\r\n")
+        length = int(headers.rsplit(b"Content-Length: ", 1)[1])
+        while len(self.buffer) < length + 2:
+            chunk = self.sock.recv(65536)
+            assert chunk, "connection closed"
+            self.buffer += chunk
+        jpeg, self.buffer = self.buffer[:length], self.buffer[length + 2:]
+        return jpeg
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def server():
+    stream_server = StreamServer(port=0, max_fps=None)
+    encoded = []
+    encode = stream_server._encode
+    stream_server._encode = lambda frame: encoded.append(frame) or encode(frame)
+    stream_server.encoded = encoded
+    stream_server.start()
+    stream_server.publish("cam", np.zeros((8, 8, 3), dtype=np.uint8))  # Registers the view
+    yield stream_server
+    stream_server.stop()
+
+
+def _frame(value, shape=(48, 64, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_nothing_is_encoded_without_clients(server):
+    for i in range(5):
+        server.publish("cam", _frame(i))
+    time.sleep(0.05)
+    assert not server.wants("cam")
+    assert server.encoded == []
+
+
+def test_same_bytes_fan_out_to_every_client_and_republished_frames_are_not_encoded(server):
+    a, b = _Client(server.port, "cam"), _Client(server.port, "cam")
+    try:
+        _wait_for(lambda: server._streams["cam"].clients == 2)
+        frame = _frame(200)
+        server.publish("cam", frame)
+        jpeg = a.frame()
+        assert b.frame() == jpeg
+        server.publish("cam", frame)  # Pipeline republishes a source's output until it captures again
+        server.publish("cam", frame)
+        time.sleep(0.05)
+        assert len(server.encoded) == 1
+    finally:
+        a.close()
+        b.close()
+    _wait_for(lambda: not server.wants("cam"))
+    server.publish("cam", _frame(10))
+    time.sleep(0.05)
+    assert len(server.encoded) == 1
+
+
+def test_slow_client_skips_to_the_newest_frame(server):
+    rng = np.random.default_rng(0)
+    fast, slow = _Client(server.port, "cam"), _Client(server.port, "cam", rcvbuf=4096)
+    try:
+        _wait_for(lambda: server._streams["cam"].clients == 2)
+        last = b""
+        for _ in range(60):  # Noise frames do not compress, so the slow client's buffers fill up
+            server.publish("cam", rng.integers(0, 256, (480, 640, 3), dtype=np.uint8))
+            last = fast.frame()
+        received = [slow.frame()]
+        while received[-1] != last:
+            received.append(slow.frame())
+        assert len(received) < 60
+    finally:
+        fast.close()
+        slow.close()
+
+
+def test_start_raises_when_the_port_is_taken():
+    with socket.create_server(("127.0.0.1", 0)) as taken:
+        stream_server = StreamServer(port=taken.getsockname()[1])
+        started = time.monotonic()
+        with pytest.raises(OSError):
+            stream_server.start()
+        assert time.monotonic() - started < 2.0
+        stream_server.stop()  # Safe after a failed start
+    assert not [t for t in threading.enumerate() if t.name in ("StreamServer", "StreamEncoder")]
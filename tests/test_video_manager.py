@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from utils.SyntheticVideoSource import SyntheticVideoSource  # noqa: E402
+from utils.VideoManager import VideoManager  # noqa: E402
+from utils.VideoSourceHelper import VideoSourceHelper  # noqa: E402
+
+
+class _Factory:
+    """SyntheticVideoSource factory whose successive opens take the given delays."""
+
+    def __init__(self, *delays):
+        self.delays = list(delays)
+        self.opened = []
+
+    def __call__(self, source, name):
+        self.opened.append((source, name))
+        delay = self.delays.pop(0) if self.delays else 0.0
+        return SyntheticVideoSource(source, name=name, width=32, height=24, open_delay=delay)
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def detected(monkeypatch):
+    """Sources restart_sources() finds, instead of scanning cameras and the video folder."""
+    found = []
+    monkeypatch.setattr(VideoSourceHelper, "get_all_sources", staticmethod(lambda folder: list(found)))
+    return found
+
+
+def test_sources_open_concurrently_and_keep_input_order():
+    factory = _Factory(0.3, 0.05, 0.3)
+    start = time.perf_counter()
+    manager = VideoManager(sources=[0, 1, 2], source_factory=factory)
+    assert manager.wait_for_first_source(timeout=1.0)
+    assert [s.name for s in manager.sources] == ["Source 1"]
+    assert manager.wait_until_opened(timeout=2.0)
+    assert time.perf_counter() - start < 0.55  # Not the 0.65 s a sequential open would take
+    assert [s.name for s in manager.sources] == ["Source 0", "Source 1", "Source 2"]
+    manager.stop_all()
+
+
+def test_slow_source_fails_without_blocking_the_others():
+    manager = VideoManager(sources=[0, 1], source_factory=_Factory(0.0, 0.5), open_timeout=0.1)
+    assert manager.wait_until_opened(timeout=1.0)
+    assert [s.name for s in manager.sources] == ["Source 0"]
+    assert "timed out" in manager.failed["Source 1"]
+    time.sleep(0.5)  # The late open completes and is released, not added
+    assert [s.name for s in manager.sources] == ["Source 0"]
+    manager.stop_all()
+
+
+def test_timed_out_source_is_retried_once_under_its_name(detected):
+    factory = _Factory(0.4, 0.0)
+    manager = VideoManager(sources=[7], source_factory=factory, open_timeout=0.1)
+    detected.append(7)
+    manager.wait_until_opened(timeout=1.0)
+    manager.restart_sources()  # First open still blocked: no second one
+    assert len(factory.opened) == 1
+
+    _wait_for(lambda: not manager._in_flight)
+    manager.restart_sources()
+    _wait_for(lambda: manager.sources)
+    assert factory.opened == [(7, "Source 0"), (7, "Source 0")]
+    assert manager.failed == {}
+    manager.stop_all()
+
+
+def test_superseded_open_finishing_does_not_hide_a_blocked_newer_one(detected):
+    # Remove + re-add (a worker's assignment changing back) leaves two opens of one source in flight
+    factory = _Factory(0.3, 1.0, 0.0)
+    manager = VideoManager(sources=[], source_factory=factory, open_timeout=0.2)
+    detected.append(3)
+    manager.add_new_source(3, name="A")
+    manager.remove_source("A")
+    manager.add_new_source(3, name="A")
+    _wait_for(lambda: "A" in manager.failed)
+    time.sleep(0.2)  # The first, superseded open has returned by now; the second is still blocked
+    manager.restart_sources()
+    assert len(factory.opened) == 2
+
+    _wait_for(lambda: not manager._in_flight)
+    manager.restart_sources()
+    _wait_for(lambda: manager.sources)
+    assert len(factory.opened) == 3
+    manager.stop_all()
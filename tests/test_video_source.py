@@ -0,0 +1,43 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from utils.SyntheticVideoSource import SyntheticVideoSource  # noqa: E402
+
+
+def _source(**sizes):
+    return SyntheticVideoSource(0, width=32, height=24, **sizes)
+
+
+def _frame(w, h):
+    return np.random.default_rng(0).integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+def test_inference_frame_keeps_the_aspect_ratio():
+    inference, display = _source(inference_size=640)._downscale(_frame(1920, 1080))
+    assert inference.shape == (360, 640, 3)
+    assert display is None
+    portrait, _ = _source(inference_size=640)._downscale(_frame(720, 1280))
+    assert portrait.shape == (640, 360, 3)
+
+
+def test_small_frames_are_not_upscaled():
+    frame = _frame(320, 240)
+    inference, _ = _source(inference_size=640)._downscale(frame)
+    assert inference is frame
+
+
+def test_display_frame_has_exactly_the_display_size():
+    for sizes in (dict(display_size=(400, 300)), dict(inference_size=640, display_size=(400, 300))):
+        _, display = _source(**sizes)._downscale(_frame(1920, 1080))
+        assert display.shape == (300, 400, 3)
+
+
+def test_display_frame_is_derived_from_the_inference_frame():
+    inference, display = _source(inference_size=640, display_size=(400, 400))._downscale(_frame(1920, 1080))
+    assert np.array_equal(display, cv2.resize(inference, (400, 400), interpolation=cv2.INTER_LINEAR))
+
+
+def test_no_sizes_produce_nothing_extra():
+    assert _source()._downscale(_frame(64, 48)) == (None, None)
@@ -0,0 +1,245 @@
+import datetime
+import json
+import queue
+import socket
+import threading
+import time
+from typing import Any, Dict, Final, List, NamedTuple, Optional, TextIO, Tuple
+from utils.Metrics import METRICS
+
+DEFAULT_QUEUE_SIZE: Final[int] = 4096
+DEFAULT_RATE: Final[float] = 20.0          # Events per second per (kind, source)
+DEFAULT_BURST: Final[float] = 40.0
+DEFAULT_PRESENCE_INTERVAL: Final[float] = 5.0  # Seconds between repeated "person still present" events
+
+# Event kinds
+DETECTION: Final[str] = "detection"
+SOURCE: Final[str] = "source"
+CONTROL: Final[str] = "control"
+
+_EVENTS_EMITTED = METRICS.counter("event_bus_emitted", "Events accepted onto the bus queue")
+_EVENTS_DROPPED = METRICS.counter("event_bus_dropped", "Events dropped because the queue was full or rate limited")
+
+
+class Event(NamedTuple):
+    """One structured event. data holds kind-specific fields."""
+    kind: str
+    source: str
+    timestamp: float  # time.time()
+    data: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "source": self.source, "time": self.timestamp, **self.data}
+
+
+class EventHandler:
+    """Base class for event sinks. handle() runs on the dispatcher thread, never on the hot path."""
+
+    def handle(self, event: Event) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+def format_event(event: Event) -> str:
+    """Human-readable line in the style of the console messages the events replace."""
+    data = event.data
+    if event.kind == DETECTION:
+        if data.get("count", 0) == 0:
+            return f"[DETECTED] {event.source}: clear"
+        state = "still present" if data.get("repeat") else "detected"
+        return f"[DETECTED] {event.source}: {data['count']} object(s) {state}"
+    if event.kind == SOURCE:
+        level = "ERROR" if data.get("error") else "INFO"
+        detail = f" -> {data['error']}" if data.get("error") else ""
+        return f"[{level}] Source '{event.source}' {data.get('status', '')}{detail}"
+    if event.kind == CONTROL:
+        details = " ".join(f"{k}={v}" for k, v in data.items() if k != "action")
+        return f"[INFO] {data.get('action', '')} {details}".rstrip()
+    return f"[{event.kind.upper()}] {event.source}: {data}"
+
+
+class ConsoleHandler(EventHandler):
+    """Print events to stdout, as the pipeline did before the bus existed."""
+
+    def handle(self, event: Event) -> None:
+        print(format_event(event))
+
+
+class LogFileHandler(EventHandler):
+    """Append timestamped human-readable lines to a log file."""
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._file: TextIO = open(path, "a", encoding="utf-8", buffering=1)
+
+    def handle(self, event: Event) -> None:
+        stamp = datetime.datetime.fromtimestamp(event.timestamp).isoformat(timespec="milliseconds")
+        self._file.write(f"{stamp} {format_event(event)}\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class JsonLinesHandler(EventHandler):
+    """Append one JSON object per event to a file."""
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._file: TextIO = open(path, "a", encoding="utf-8", buffering=1)
+
+    def handle(self, event: Event) -> None:
+        self._file.write(json.dumps(event.to_dict(), default=str) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SocketHandler(EventHandler):
+    """
+    Send each event as a JSON datagram to a local UDP socket.
+
+    UDP keeps the dispatcher from ever blocking on a slow or absent listener;
+    events are simply lost when nobody is listening.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9109) -> None:
+        self.address: Tuple[str, int] = (host, port)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+
+    def handle(self, event: Event) -> None:
+        try:
+            self._sock.sendto(json.dumps(event.to_dict(), default=str).encode("utf-8"), self.address)
+        except OSError:
+            pass  # No listener / buffer full: drop rather than stall the dispatcher
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+class EventBus:
+    """
+    Non-blocking structured event bus.
+
+    emit() only does a rate-limit check and a put_nowait() onto a bounded
+    queue; a background thread delivers events to the handlers. When the
+    queue is full, or a (kind, source) pair exceeds its token bucket, the
+    event is dropped and counted instead of slowing the caller. With no
+    handlers registered emit() returns immediately.
+
+    Args:
+        maxsize (int): Queue capacity
+        rate (float): Sustained events/second allowed per (kind, source)
+        burst (float): Token bucket size per (kind, source)
+        presence_interval (float): Minimum seconds between repeated detection events
+            with an unchanged count
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_QUEUE_SIZE, rate: float = DEFAULT_RATE,
+                 burst: float = DEFAULT_BURST, presence_interval: float = DEFAULT_PRESENCE_INTERVAL) -> None:
+        self.rate: float = rate
+        self.burst: float = burst
+        self.presence_interval: float = presence_interval
+        self.handlers: List[EventHandler] = []
+        self.dropped: int = 0
+        self._queue: "queue.Queue[Optional[Event]]" = queue.Queue(maxsize=maxsize)
+        self._buckets: Dict[Tuple[str, str], List[float]] = {}    # (kind, source) -> [tokens, last refill]
+        self._presence: Dict[str, Tuple[int, float]] = {}        # source -> (last count, last emit time)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._m_emitted = _EVENTS_EMITTED.labels()
+        self._m_dropped = _EVENTS_DROPPED.labels()
+
+    def add_handler(self, handler: EventHandler) -> None:
+        self.handlers = self.handlers + [handler]  # Copy-on-write; the dispatcher iterates without locking
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._dispatch, daemon=True, name="EventBus")
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Deliver queued events, stop the dispatcher and close every handler."""
+        if self._thread is not None:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+            self._thread = None
+        for handler in self.handlers:
+            handler.close()
+        self.handlers = []
+
+    def _allow(self, kind: str, source: str, now: float) -> bool:
+        with self._lock:
+            bucket = self._buckets.get((kind, source))
+            if bucket is None:
+                bucket = self._buckets[(kind, source)] = [self.burst, now]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                return False
+            bucket[0] -= 1.0
+            return True
+
+    def _drop(self) -> None:
+        self.dropped += 1
+        self._m_dropped.inc()
+
+    def emit(self, kind: str, source: str, **data: Any) -> bool:
+        """Queue an event without blocking. Safe to call from any thread. Returns False if it was dropped."""
+        if not self.handlers:
+            return False
+        if not self._allow(kind, source, time.monotonic()):
+            self._drop()
+            return False
+        try:
+            self._queue.put_nowait(Event(kind, source, time.time(), data))
+            self._m_emitted.inc()
+            return True
+        except queue.Full:
+            self._drop()
+            return False
+
+    def detection(self, source: str, count: int) -> None:
+        """
+        Report the number of people currently seen by a source, debounced.
+
+        An event is emitted when the count changes (including back to zero);
+        an unchanged non-zero count is repeated at most once per presence_interval.
+        The last count is only remembered once its event is queued, so a change
+        dropped by the rate limiter or a full queue is re-sent on the next call
+        and handlers never stay on a stale count (e.g. miss the return to zero).
+        """
+        if not self.handlers:
+            return
+        now: float = time.monotonic()
+        with self._lock:
+            last_count, last_time = self._presence.get(source, (0, 0.0))
+        changed: bool = count != last_count
+        if not changed and (count == 0 or now - last_time < self.presence_interval):
+            return
+        if self.emit(DETECTION, source, count=count, repeat=not changed):
+            with self._lock:
+                self._presence[source] = (count, now)
+
+    def _dispatch(self) -> None:
+        from utils.ResourceManager import RESOURCES  # ResourceManager itself reports through EVENTS
+        RESOURCES.pin_auxiliary_thread()
+        while True:
+            event = self._queue.get()
+            if event is None:
+                break
+            for handler in self.handlers:
+                try:
+                    handler.handle(event)
+                except Exception as e:
+                    print(f"[ERROR] Event handler {type(handler).__name__} failed: {e}")
+
+
+# Shared bus used by VideoSource, VideoManager, Detector and Pipeline
+EVENTS: Final[EventBus] = EventBus()
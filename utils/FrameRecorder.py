@@ -0,0 +1,247 @@
+"""
+Raw frame recording in a memory-mappable file format.
+
+Layout (little endian):
+    header (64 bytes): magic b"RAWFRM01", version u32, width u32, height u32,
+                       channels u32, frame_count u64, fps f64, zero padding
+    records:           [timestamp f64][height * width * channels uint8] * N
+
+Every record has the same size, so record i lives at HEADER_SIZE + i * record_size
+and the whole file maps onto a numpy structured array without copying. The
+frame count is derived from the file size, so a recording that was cut short
+(crash, power loss) is still readable up to its last complete frame.
+
+Usage:
+    python -m utils.FrameRecorder rtsp://camera/stream site.rawframes --seconds 30
+"""
+import argparse
+import os
+import queue
+import struct
+import threading
+import time
+import numpy as np
+import numpy.typing as npt
+from typing import Any, Final, Optional, Tuple
+from utils.ResourceManager import RESOURCES
+
+MAGIC: Final[bytes] = b"RAWFRM01"
+FORMAT_VERSION: Final[int] = 1
+HEADER_SIZE: Final[int] = 64
+_HEADER_STRUCT: Final[struct.Struct] = struct.Struct("<8sIIIIQd")
+_FRAME_COUNT_OFFSET: Final[int] = struct.calcsize("<8sIIII")
+
+
+def record_dtype(width: int, height: int, channels: int) -> np.dtype:
+    """Structured dtype of one record; used both for writing and for np.memmap."""
+    return np.dtype([("timestamp", "<f8"), ("frame", np.uint8, (height, width, channels))])
+
+
+class RawFrameFile:
+    """
+    Read-only memory-mapped view of a recording.
+
+    Attributes:
+        width, height, channels (int): Frame geometry
+        fps (float): Nominal rate of the recorded source
+        timestamps (np.ndarray): Capture times in seconds, relative to the first frame
+        frames (np.ndarray): (N, H, W, C) uint8 view straight into the mapping
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"Not a raw frame file (truncated header): {path}")
+        magic, version, width, height, channels, _, fps = _HEADER_STRUCT.unpack_from(header)
+        if magic != MAGIC:
+            raise ValueError(f"Not a raw frame file (bad magic): {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported raw frame file version {version}: {path}")
+
+        self.width: int = width
+        self.height: int = height
+        self.channels: int = channels
+        self.fps: float = fps
+
+        dtype = record_dtype(width, height, channels)
+        count: int = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+        if count > 0:
+            self._records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self._records = np.zeros(0, dtype=dtype)
+        self.timestamps: npt.NDArray[np.float64] = self._records["timestamp"]
+        self.frames: npt.NDArray[np.uint8] = self._records["frame"]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def frame(self, index: int) -> Tuple[npt.NDArray[np.uint8], float]:
+        """Return (frame view, timestamp) for one record without copying pixels."""
+        return self.frames[index], float(self.timestamps[index])
+
+    def close(self) -> None:
+        mm = getattr(self._records, "_mmap", None)
+        self._records = self.frames = self.timestamps = None  # Drop views before unmapping
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:
+                pass  # Frames handed out are still alive; the mapping is released with the last one
+
+
+class FrameRecorder:
+    """
+    Append raw frames and their timestamps to a RawFrameFile.
+
+    Geometry is taken from the first frame. Instances are callable with
+    (frame, capture_time), so they can be attached directly with
+    VideoSource.add_frame_listener().
+
+    append() only queues the frame (by reference, so it must not be modified
+    afterwards); a writer thread does the disk I/O, keeping the capture thread
+    and the timestamps it records unaffected by write latency. When the disk
+    cannot keep up and max_queue frames are waiting, new frames are dropped
+    and counted in dropped_frames rather than stalling capture.
+
+    Args:
+        path (str): Output file, overwritten if it exists
+        fps (float): Nominal source rate stored in the header
+        max_frames (Optional[int]): Stop recording after this many frames
+        max_queue (int): Frames buffered for the writer thread
+    """
+
+    def __init__(self, path: str, fps: float = 30.0, max_frames: Optional[int] = None,
+                 max_queue: int = 32) -> None:
+        self.path: str = path
+        self.fps: float = fps
+        self.max_frames: Optional[int] = max_frames
+        self.frame_count: int = 0     # Frames accepted (all written once close() returns)
+        self.dropped_frames: int = 0  # Frames rejected because the writer queue was full
+        self._shape: Optional[Tuple[int, ...]] = None
+        self._first_time: Optional[float] = None
+        self._closed: bool = False
+        self._written: int = 0
+        self._error: Optional[OSError] = None
+        self._file = open(path, "wb")
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple[npt.NDArray[Any], float]]]" = queue.Queue(maxsize=max_queue)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True, name="FrameRecorderWriter")
+        self._writer.start()
+
+    def __call__(self, frame: npt.NDArray[Any], capture_time: float) -> None:
+        self.append(frame, capture_time)
+
+    def __enter__(self) -> "FrameRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def full(self) -> bool:
+        return self.max_frames is not None and self.frame_count >= self.max_frames
+
+    def append(self, frame: npt.NDArray[Any], capture_time: Optional[float] = None) -> None:
+        """Queue one frame for writing. Frames after max_frames or after close() are ignored."""
+        if capture_time is None:
+            capture_time = time.perf_counter()
+        if frame.dtype != np.uint8:
+            raise ValueError(f"Only uint8 frames can be recorded, got {frame.dtype}")
+        if frame.ndim == 2:
+            frame = frame[:, :, None]
+
+        with self._lock:
+            if self._closed or self.full:
+                return
+            if self._shape is None:
+                self._shape = frame.shape
+                self._first_time = capture_time
+            elif frame.shape != self._shape:
+                raise ValueError(f"Frame shape changed from {self._shape} to {frame.shape}")
+            try:
+                self._queue.put_nowait((frame, capture_time - self._first_time))
+            except queue.Full:
+                self.dropped_frames += 1
+                return
+            self.frame_count += 1
+
+    def _write_loop(self) -> None:
+        RESOURCES.pin_auxiliary_thread()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue  # Keep draining so append()/close() never block on a dead writer
+            frame, timestamp = item
+            try:
+                if self._written == 0:
+                    height, width, channels = frame.shape
+                    self._file.write(self._header(width, height, channels).ljust(HEADER_SIZE, b"\0"))
+                self._file.write(struct.pack("<d", timestamp))
+                self._file.write(memoryview(np.ascontiguousarray(frame)))  # No copy for contiguous frames
+                self._written += 1
+            except OSError as e:
+                self._error = e
+
+    def _header(self, width: int, height: int, channels: int) -> bytes:
+        return _HEADER_STRUCT.pack(MAGIC, FORMAT_VERSION, width, height, channels, self._written, self.fps)
+
+    def close(self) -> None:
+        """Wait for queued frames, store the final frame count in the header and close the file."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        if self._written > 0 and self._error is None:
+            self._file.seek(_FRAME_COUNT_OFFSET)
+            self._file.write(struct.pack("<Q", self._written))
+        self._file.close()
+        self.frame_count = self._written
+        print(f"[INFO] Recorded {self.frame_count} frame(s) to {self.path}")
+        if self.dropped_frames:
+            print(f"[ERROR] {self.dropped_frames} frame(s) dropped: disk writes could not keep up")
+        if self._error is not None:
+            print(f"[ERROR] Recording to {self.path} failed: {self._error}")
+
+
+def record_source(source: Any, path: str, seconds: Optional[float] = None,
+                  max_frames: Optional[int] = None) -> int:
+    """
+    Record frames from a started VideoSource until seconds/max_frames is reached or the source stops.
+
+    Returns:
+        int: Number of frames written
+    """
+    recorder = FrameRecorder(path, fps=source.source_fps, max_frames=max_frames)
+    source.add_frame_listener(recorder)
+    deadline: float = time.perf_counter() + seconds if seconds is not None else float("inf")
+    try:
+        while source.is_active() and not recorder.full and time.perf_counter() < deadline:
+            time.sleep(0.05)
+    finally:
+        source.remove_frame_listener(recorder)
+        recorder.close()
+    return recorder.frame_count
+
+
+if __name__ == "__main__":
+    from utils.VideoSource import VideoSource
+
+    parser = argparse.ArgumentParser(description="Record raw frames from a camera index, file or URL.")
+    parser.add_argument("source", help="Camera index, video file or stream URL")
+    parser.add_argument("output", help="Destination .rawframes file")
+    parser.add_argument("--seconds", type=float, default=None)
+    parser.add_argument("--frames", type=int, default=None)
+    cli = parser.parse_args()
+
+    src = VideoSource(int(cli.source) if cli.source.isdigit() else cli.source)
+    src.start()
+    try:
+        record_source(src, cli.output, seconds=cli.seconds, max_frames=cli.frames)
+    finally:
+        src.stop()
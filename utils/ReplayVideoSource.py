@@ -0,0 +1,93 @@
+import time
+import cv2
+import numpy as np
+import numpy.typing as npt
+from typing import Any, Optional, Tuple
+from utils.VideoSource import VideoSource, SourceType
+from utils.FrameRecorder import RawFrameFile
+
+
+class ReplayCapture:
+    """
+    cv2.VideoCapture stand-in serving frames from a RawFrameFile.
+
+    read() returns read-only views into the memory mapping (no decode, no copy)
+    and blocks until the frame's recorded timestamp, scaled by speed, is due.
+
+    Args:
+        path (str): Recording produced by FrameRecorder
+        speed (float): 1.0 replays at original timing, 2.0 twice as fast, 0 as fast as possible
+        loop (bool): Restart from the first frame instead of signalling EOF
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = False) -> None:
+        self.file: RawFrameFile = RawFrameFile(path)
+        self.speed: float = speed
+        self.loop: bool = loop
+        self.position: int = 0
+        self.opened: bool = len(self.file) > 0
+        self._start: Optional[float] = None
+        self._offset: float = 0.0  # Accumulated recording length from previous loops
+
+    def isOpened(self) -> bool:
+        return self.opened
+
+    def read(self) -> Tuple[bool, Optional[npt.NDArray[np.uint8]]]:
+        if not self.opened:
+            return False, None
+        if self.position >= len(self.file):
+            if not self.loop:
+                return False, None
+            self._offset += float(self.file.timestamps[-1]) + 1.0 / max(self.file.fps, 1e-6)
+            self.position = 0
+
+        frame, timestamp = self.file.frame(self.position)
+        self.position += 1
+
+        if self.speed > 0:
+            now: float = time.perf_counter()
+            if self._start is None:
+                self._start = now
+            due: float = self._start + (self._offset + timestamp) / self.speed
+            if due > now:
+                time.sleep(due - now)
+        return True, frame
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FPS:
+            return self.file.fps
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.file.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.file.height)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.file))
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        return 0.0
+
+    def release(self) -> None:
+        if self.opened:
+            self.opened = False
+            self.file.close()
+
+
+class ReplayVideoSource(VideoSource):
+    """
+    Deterministic VideoSource replaying a FrameRecorder file.
+
+    The source argument is the recording path, so it can be used as a
+    VideoManager source_factory: VideoManager(paths, source_factory=ReplayVideoSource).
+    """
+
+    def __init__(self, source: SourceType, name: Optional[str] = None,
+                 speed: float = 1.0, loop: bool = False, **options: Any) -> None:
+        self.speed: float = speed
+        self.loop: bool = loop
+        super().__init__(source, name=name, **options)
+
+    def _open_capture(self) -> ReplayCapture:
+        return ReplayCapture(str(self.source), speed=self.speed, loop=self.loop)
+
+    def _frame_delay(self) -> float:
+        return 0.0  # ReplayCapture.read() already waits for each frame's timestamp
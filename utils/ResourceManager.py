@@ -0,0 +1,271 @@
+import os
+import threading
+import time
+from typing import Callable, FrozenSet, Final, List, NamedTuple, Optional, Sequence, Set
+from utils.EventBus import EVENTS, CONTROL
+
+# Linux exposes per-thread affinity through sched_setaffinity(0, ...); elsewhere pinning is a no-op
+AFFINITY_SUPPORTED: Final[bool] = hasattr(os, "sched_setaffinity")
+DEFAULT_TUNE_SECONDS: Final[float] = 5.0
+
+
+def available_cores() -> List[int]:
+    """CPU ids this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+_ALL_CORES: Final[FrozenSet[int]] = frozenset(available_cores())
+
+
+class ResourceConfig(NamedTuple):
+    """
+    Thread and core layout for capture and inference.
+
+    None leaves the corresponding library default / OS scheduling untouched.
+    """
+    torch_threads: Optional[int] = None         # torch.set_num_threads (intra-op pool)
+    torch_interop_threads: Optional[int] = None  # torch.set_num_interop_threads, only settable once
+    opencv_threads: Optional[int] = None        # cv2.setNumThreads (0 disables OpenCV's pool, -1 restores default)
+    inference_cores: Optional[FrozenSet[int]] = None
+    capture_cores: Optional[FrozenSet[int]] = None
+
+    @classmethod
+    def split(cls, inference_fraction: float = 0.75, cores: Optional[Sequence[int]] = None,
+              opencv_threads: Optional[int] = 0) -> "ResourceConfig":
+        """
+        Give the first inference_fraction of the cores to inference and the rest to capture.
+
+        torch gets one intra-op thread per inference core so its pool never oversubscribes them.
+        """
+        cores = list(cores) if cores is not None else available_cores()
+        n_inference: int = min(max(1, round(len(cores) * inference_fraction)), len(cores))
+        inference, capture = cores[:n_inference], cores[n_inference:] or cores[:n_inference]
+        return cls(torch_threads=len(inference), opencv_threads=opencv_threads,
+                   inference_cores=frozenset(inference), capture_cores=frozenset(capture))
+
+    def describe(self) -> str:
+        def cores(c: Optional[FrozenSet[int]]) -> str:
+            return "any" if c is None else ",".join(map(str, sorted(c)))
+        return (f"torch={self.torch_threads} opencv={self.opencv_threads} "
+                f"inference_cores={cores(self.inference_cores)} capture_cores={cores(self.capture_cores)}")
+
+
+class ResourceManager:
+    """
+    Applies a ResourceConfig to torch, OpenCV and the threads that do the work.
+
+    The inference side is applied from Detector._setup_device(), on the thread
+    that later runs inference, before the model is loaded: torch's worker pool
+    inherits that thread's affinity. Re-applying it later (autotune trials)
+    cannot rely on inheritance because the pool already exists, so the
+    native (non-Python) threads still pinned like the inference thread are
+    treated as its pool and re-pinned with it. Capture threads call
+    pin_capture_thread() when they start and again whenever the
+    configuration generation changes; auxiliary threads (streaming, event
+    dispatch, metrics, recording) call pin_auxiliary_thread() once, so they
+    never inherit the inference pinning of whoever created them.
+
+    Thread counts a configuration leaves as None go back to the library's
+    own value from before the first change, so the layout left applied is
+    always the one that was configured.
+    """
+
+    def __init__(self, config: Optional[ResourceConfig] = None) -> None:
+        self.config: ResourceConfig = config or ResourceConfig()
+        self.generation: int = 0  # Bumped on every configure(); capture threads compare against it
+        self._interop_set: bool = False
+        # torch/OpenCV thread counts from before this manager first changed them, restored for None
+        self._default_torch_threads: Optional[int] = None
+        self._default_opencv_threads: Optional[int] = None
+        self._inference_applied: bool = False
+        self._capture_tids: Set[int] = set()  # Native ids of registered capture threads
+        self._aux_tids: Set[int] = set()      # Native ids of registered auxiliary threads
+        self._lock = threading.Lock()
+
+    def configure(self, config: ResourceConfig) -> None:
+        """Install a new configuration and apply the library-wide thread counts immediately."""
+        with self._lock:
+            self.config = config
+            self.generation += 1
+        self._apply_thread_counts()
+        if self._aux_tids:
+            self._pin_threads(self._aux_tids, self.config.capture_cores)
+
+    def _apply_thread_counts(self) -> None:
+        config = self.config
+        opencv_threads: Optional[int] = config.opencv_threads
+        if opencv_threads is not None or self._default_opencv_threads is not None:
+            import cv2
+            if self._default_opencv_threads is None:
+                self._default_opencv_threads = cv2.getNumThreads()
+            cv2.setNumThreads(opencv_threads if opencv_threads is not None else self._default_opencv_threads)
+        torch_threads: Optional[int] = config.torch_threads
+        if torch_threads is None and self._default_torch_threads is None and config.torch_interop_threads is None:
+            return
+        try:
+            import torch
+        except ImportError:
+            return  # Stub-detector runs (benchmarks, cluster tests) only tune OpenCV and affinity
+        if torch_threads is not None or self._default_torch_threads is not None:
+            if self._default_torch_threads is None:
+                self._default_torch_threads = torch.get_num_threads()
+            torch.set_num_threads(torch_threads if torch_threads is not None else self._default_torch_threads)
+        if config.torch_interop_threads is not None and not self._interop_set:
+            try:
+                torch.set_num_interop_threads(config.torch_interop_threads)
+                self._interop_set = True
+            except RuntimeError:
+                # Only allowed before any inter-op work has started
+                print("[INFO] torch inter-op threads already fixed; keeping current value")
+
+    def _target(self, cores: Optional[FrozenSet[int]]) -> Optional[FrozenSet[int]]:
+        """Cores to pin to, or None to leave threads alone (nothing has ever been configured)."""
+        if not AFFINITY_SUPPORTED or (cores is None and self.generation == 0):
+            return None
+        return cores or _ALL_CORES  # None after a pinned configuration means "unpin"
+
+    def _pin(self, cores: Optional[FrozenSet[int]]) -> None:
+        target = self._target(cores)
+        if target is None:
+            return
+        try:
+            os.sched_setaffinity(0, target)  # 0 = calling thread on Linux
+        except OSError as e:
+            print(f"[ERROR] Could not set affinity {sorted(target)}: {e}")
+
+    def _pin_threads(self, tids: Set[int], cores: Optional[FrozenSet[int]]) -> None:
+        """Pin other threads by native id; threads that exited meanwhile are forgotten."""
+        target = self._target(cores)
+        if target is None:
+            return
+        for tid in list(tids):
+            try:
+                os.sched_setaffinity(tid, target)
+            except ProcessLookupError:
+                tids.discard(tid)
+            except OSError as e:
+                print(f"[ERROR] Could not set affinity {sorted(target)} for thread {tid}: {e}")
+
+    @staticmethod
+    def _pool_tids(inference_affinity: Set[int]) -> Set[int]:
+        """
+        Native threads of this process still pinned like the inference thread: its torch pool.
+
+        Threads started through threading (capture, auxiliary, source openers,
+        socket and HTTP handlers) are never part of the pool, and native threads
+        spawned elsewhere (e.g. FFmpeg decoders under a capture thread) carry
+        their creator's affinity instead.
+        """
+        try:
+            tids = {int(t) for t in os.listdir("/proc/self/task")}
+        except OSError:
+            return set()
+        pool: Set[int] = set()
+        for tid in tids - {t.native_id for t in threading.enumerate()}:
+            try:
+                if os.sched_getaffinity(tid) == inference_affinity:
+                    pool.add(tid)
+            except OSError:
+                pass  # Exited meanwhile
+        return pool
+
+    def apply_inference(self) -> None:
+        """
+        Pin the calling (inference) thread and apply the thread counts.
+
+        The first call happens before the model exists, so the torch pool
+        created afterwards inherits the pinning. Later calls re-pin the
+        already running pool threads as well.
+        """
+        previous: Optional[Set[int]] = None
+        if self._inference_applied and AFFINITY_SUPPORTED:
+            previous = os.sched_getaffinity(0)
+        self._pin(self.config.inference_cores)  # First, so pool threads created below inherit it
+        self._apply_thread_counts()
+        if previous is not None:
+            self._pin_threads(self._pool_tids(previous), self.config.inference_cores)
+        self._inference_applied = True
+
+    def pin_capture_thread(self) -> int:
+        """Pin the calling capture thread. Returns the generation applied, for change detection."""
+        with self._lock:
+            self._capture_tids.add(threading.get_native_id())
+        self._pin(self.config.capture_cores)
+        return self.generation
+
+    def pin_auxiliary_thread(self) -> None:
+        """
+        Pin the calling helper thread to the capture cores and keep it there on reconfiguration.
+
+        Call at the start of long-lived threads that are neither capture nor
+        inference, so they don't inherit the inference pinning of their creator.
+        """
+        with self._lock:
+            self._aux_tids.add(threading.get_native_id())
+        self._pin(self.config.capture_cores)
+
+    def autotune(self, workload: Callable[[], int], candidates: Optional[Sequence[ResourceConfig]] = None,
+                 seconds: float = DEFAULT_TUNE_SECONDS, warmup: float = 1.0) -> ResourceConfig:
+        """
+        Sweep configurations against a workload and keep the one with the best throughput.
+
+        Args:
+            workload (Callable[[], int]): One unit of work returning the new frames it processed,
+                e.g. pipeline.process_fresh; counting re-processed stale frames would reward
+                layouts that starve the capture threads
+            candidates (Optional[Sequence[ResourceConfig]]): Configurations to try;
+                defaults to default_candidates()
+            seconds (float): Measured time per candidate
+            warmup (float): Unmeasured time per candidate after re-pinning
+
+        Returns:
+            ResourceConfig: The winning configuration, which is left applied
+        """
+        candidates = list(candidates) if candidates is not None else self.default_candidates()
+        best: Optional[ResourceConfig] = None
+        best_fps: float = -1.0
+
+        for candidate in candidates:
+            self.configure(candidate)
+            self.apply_inference()  # The tuning thread is the inference thread
+            end: float = time.perf_counter() + warmup
+            while time.perf_counter() < end:
+                workload()
+
+            frames: int = 0
+            start: float = time.perf_counter()
+            end = start + seconds
+            while time.perf_counter() < end:
+                frames += workload()
+            fps: float = frames / (time.perf_counter() - start)
+            EVENTS.emit(CONTROL, "resources", action="autotune trial", fps=round(fps, 1), config=candidate.describe())
+            if fps > best_fps:
+                best, best_fps = candidate, fps
+
+        assert best is not None, "autotune needs at least one candidate"
+        self.configure(best)
+        self.apply_inference()
+        EVENTS.emit(CONTROL, "resources", action="autotune selected", fps=round(best_fps, 1), config=best.describe())
+        return best
+
+    @staticmethod
+    def default_candidates(cores: Optional[Sequence[int]] = None) -> List[ResourceConfig]:
+        """Core splits of 25/50/75% for inference, with and without OpenCV's thread pool, plus the untouched default."""
+        cores = list(cores) if cores is not None else available_cores()
+        candidates: List[ResourceConfig] = [ResourceConfig()]
+        if len(cores) < 2:
+            return candidates + [ResourceConfig(torch_threads=1, opencv_threads=0)]
+        seen = set()
+        for fraction in (0.25, 0.5, 0.75):
+            for opencv_threads in (0, -1):
+                candidate = ResourceConfig.split(fraction, cores, opencv_threads=opencv_threads)
+                if candidate not in seen:
+                    seen.add(candidate)
+                    candidates.append(candidate)
+        return candidates
+
+
+# Shared manager; untouched (all None) until configure() is called
+RESOURCES: Final[ResourceManager] = ResourceManager()
@@ -0,0 +1,315 @@
+import asyncio
+import html
+import threading
+import time
+from typing import Dict, Final, Optional, Set, Tuple
+from urllib.parse import quote, unquote
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+
+from utils.Metrics import METRICS
+from utils.ResourceManager import RESOURCES
+
+GRID_STREAM: Final[str] = "grid"
+BOUNDARY: Final[bytes] = b"frame"
+DEFAULT_STREAM_PORT: Final[int] = 8080
+WRITE_BUFFER_HIGH: Final[int] = 256 * 1024  # Per-client socket buffer before drain() waits (~a few frames)
+CLIENT_STALL_TIMEOUT: Final[float] = 30.0   # A client that cannot take a frame for this long is dropped
+
+_ENCODE_SECONDS = METRICS.histogram("stream_encode_seconds", "JPEG encode time per published stream frame")
+_FRAMES_SENT = METRICS.counter("stream_frames_sent", "MJPEG frames written to clients")
+_FRAMES_SKIPPED = METRICS.counter("stream_frames_skipped", "Encoded frames a slow client never received")
+_CLIENTS = METRICS.gauge("stream_clients", "Connected MJPEG clients per view")
+
+
+class _Stream:
+    """
+    Latest encoded frame of one view, shared by every client watching it.
+
+    pending/last_frame/clients are touched from the publisher thread; jpeg/seq
+    and the wake-up event only from the event loop thread.
+    """
+
+    __slots__ = ('name', 'clients', 'pending', 'last_frame', 'last_publish', 'jpeg', 'seq', '_event')
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self.clients: int = 0
+        self.pending: Optional[npt.NDArray[np.uint8]] = None
+        self.last_frame: Optional[npt.NDArray[np.uint8]] = None  # Last frame accepted, to skip republished ones
+        self.last_publish: float = 0.0
+        self.jpeg: Optional[bytes] = None
+        self.seq: int = 0
+        self._event: Optional[asyncio.Event] = None
+
+    def update(self, jpeg: bytes) -> None:
+        """Install a newly encoded frame and wake its clients. Event loop thread only."""
+        if self.clients == 0:
+            return  # Everyone left while it was being encoded
+        self.jpeg = jpeg
+        self.seq += 1
+        if self._event is not None:
+            self._event.set()
+            self._event = None
+
+    async def next_frame(self, last_seq: int) -> Tuple[bytes, int]:
+        """Wait for a frame newer than last_seq and return the newest one (older ones are skipped)."""
+        while self.jpeg is None or self.seq <= last_seq:
+            if self._event is None:
+                self._event = asyncio.Event()
+            await self._event.wait()
+        return self.jpeg, self.seq
+
+
+class StreamServer:
+    """
+    MJPEG over HTTP for the composed grid and every annotated source.
+
+    http://host:port/                 index page
+    http://host:port/stream/grid      composed grid
+    http://host:port/stream/<source>  one source, e.g. /stream/Source%200
+
+    The pipeline calls publish() with frames it already has. A frame is
+    encoded once, on a dedicated encoder thread, and the same bytes are
+    written to every client of that view; nothing is copied or encoded for
+    views nobody is watching. Each client always gets the newest frame when
+    its socket has room again, so a slow connection drops frames instead of
+    queueing them or holding back faster clients.
+
+    Args:
+        host (str): Interface to bind; 0.0.0.0 for remote operators
+        port (int): HTTP port
+        quality (int): JPEG quality 1-100
+        max_width (Optional[int]): Frames wider than this are scaled down before encoding
+        max_fps (Optional[float]): Upper bound on encoded frames per second per view
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_STREAM_PORT, quality: int = 75,
+                 max_width: Optional[int] = None, max_fps: Optional[float] = 15.0) -> None:
+        self.host: str = host
+        self.port: int = port
+        self.quality: int = quality
+        self.max_width: Optional[int] = max_width
+        self.max_fps: Optional[float] = max_fps
+        self._streams: Dict[str, _Stream] = {GRID_STREAM: _Stream(GRID_STREAM)}
+        self._dirty: Set[str] = set()
+        self._cond = threading.Condition()
+        self._running: bool = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._started = threading.Event()
+        self._error: Optional[OSError] = None  # Why the event loop could not start, e.g. port in use
+        self._threads: list[threading.Thread] = []
+        self._handlers: Set[asyncio.Task] = set()
+
+    # ----- publisher side (pipeline thread) -----
+
+    def wants(self, name: str) -> bool:
+        """True if someone is watching the view, i.e. it is worth building a frame for it."""
+        stream = self._streams.get(name)
+        return stream is not None and stream.clients > 0
+
+    def publish(self, name: str, frame: npt.NDArray[np.uint8]) -> None:
+        """
+        Offer the latest frame of a view. Cheap no-op when nobody is watching it.
+
+        The frame is handed to the encoder thread by reference, so the caller
+        must not modify it afterwards (annotated and grid frames are fresh arrays).
+        Publishing the same array again, as the pipeline does while a source
+        has not captured, is ignored: it was already encoded.
+        """
+        stream = self._streams.get(name)
+        if stream is None:
+            self._streams = {**self._streams, name: _Stream(name)}  # Copy-on-write for the loop thread
+            return
+        if stream.clients == 0 or frame is stream.last_frame:
+            return
+        now: float = time.perf_counter()
+        if self.max_fps and now - stream.last_publish < 1.0 / self.max_fps:
+            return
+        stream.last_publish = now
+        stream.last_frame = frame
+        with self._cond:
+            stream.pending = frame
+            self._dirty.add(name)
+            self._cond.notify()
+
+    # ----- encoder thread -----
+
+    def _encode(self, frame: npt.NDArray[np.uint8]) -> Optional[bytes]:
+        if self.max_width and frame.shape[1] > self.max_width:
+            height: int = max(1, round(frame.shape[0] * self.max_width / frame.shape[1]))
+            frame = cv2.resize(frame, (self.max_width, height), interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return buffer.tobytes() if ok else None
+
+    def _encode_loop(self) -> None:
+        RESOURCES.pin_auxiliary_thread()
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._dirty or not self._running)
+                if not self._running:
+                    return
+                work: list[Tuple[_Stream, npt.NDArray[np.uint8]]] = []
+                for name in self._dirty:
+                    stream = self._streams.get(name)
+                    if stream is not None and stream.pending is not None:
+                        work.append((stream, stream.pending))
+                        stream.pending = None
+                self._dirty = set()
+
+            for stream, frame in work:
+                if stream.clients == 0:
+                    continue
+                t0: float = time.perf_counter()
+                jpeg = self._encode(frame)
+                _ENCODE_SECONDS.labels(stream=stream.name).observe(time.perf_counter() - t0)
+                loop = self._loop
+                if jpeg is not None and loop is not None:
+                    try:
+                        loop.call_soon_threadsafe(stream.update, jpeg)
+                    except RuntimeError:
+                        return  # Event loop already closed by stop()
+
+    # ----- HTTP side (event loop thread) -----
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._handlers.add(asyncio.current_task())
+        try:
+            request_line: bytes = await asyncio.wait_for(reader.readline(), timeout=10.0)
+            while (await asyncio.wait_for(reader.readline(), timeout=10.0)) not in (b"\r\n", b"\n", b""):
+                pass  # Headers are not needed
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2 or parts[0] != "GET":
+                await self._respond(writer, 405, "text/plain", b"Method not allowed\n")
+                return
+            path: str = unquote(parts[1].split("?", 1)[0])
+            if path == "/":
+                await self._respond(writer, 200, "text/html; charset=utf-8", self._index())
+            elif path.startswith("/stream/") and path[len("/stream/"):] in self._streams:
+                await self._serve_stream(self._streams[path[len("/stream/"):]], reader, writer)
+            else:
+                await self._respond(writer, 404, "text/plain", b"Unknown stream\n")
+        except (asyncio.TimeoutError, asyncio.CancelledError, ConnectionError, UnicodeDecodeError):
+            pass  # Cancelled only by stop(); finish quietly so the connection just closes
+        finally:
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, content_type: str, body: bytes) -> None:
+        reason = {200: "OK", 404: "Not Found", 405: "Method Not Allowed"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+        await writer.drain()
+
+    def _index(self) -> bytes:
+        names = [GRID_STREAM] + sorted(n for n in self._streams if n != GRID_STREAM)
+        items = "".join(
+            f'<li><a href="/stream/{quote(n)}">{html.escape(n)}</a></li>' for n in names
+        )
+        return (f"<!doctype html><title>Streams</title><ul>{items}</ul>"
+                f'<img src="/stream/{GRID_STREAM}" style="max-width:100%">').encode("utf-8")
+
+    async def _serve_stream(self, stream: _Stream, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """Send frames until the client hangs up, so views nobody watches stop being encoded at once."""
+        sender = asyncio.ensure_future(self._send_frames(stream, writer))
+        hangup = asyncio.ensure_future(reader.read(1024))  # MJPEG clients send nothing after the request
+        try:
+            await asyncio.wait({sender, hangup}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (sender, hangup):
+                task.cancel()
+            await asyncio.gather(sender, hangup, return_exceptions=True)
+
+    async def _send_frames(self, stream: _Stream, writer: asyncio.StreamWriter) -> None:
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH)
+        writer.write(b"HTTP/1.1 200 OK\r\nCache-Control: no-cache, private\r\nPragma: no-cache\r\n"
+                     b"Connection: close\r\nContent-Type: multipart/x-mixed-replace; boundary=" + BOUNDARY + b"\r\n\r\n")
+        clients = _CLIENTS.labels(stream=stream.name)
+        stream.clients += 1
+        clients.set(stream.clients)
+        sent, skipped = _FRAMES_SENT.labels(stream=stream.name), _FRAMES_SKIPPED.labels(stream=stream.name)
+        # Start from the frame other viewers are already getting, if any
+        last_seq: int = stream.seq - 1 if stream.jpeg is not None else stream.seq
+        first: bool = True
+        try:
+            while True:
+                jpeg, seq = await stream.next_frame(last_seq)
+                if not first and seq - last_seq > 1:
+                    skipped.inc(seq - last_seq - 1)
+                first, last_seq = False, seq
+                writer.write(b"--" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\nContent-Length: "
+                             + str(len(jpeg)).encode("ascii") + b"\r\n\r\n" + jpeg + b"\r\n")
+                # Blocks only while this client's buffer is full; other clients keep receiving
+                await asyncio.wait_for(writer.drain(), timeout=CLIENT_STALL_TIMEOUT)
+                sent.inc()
+        finally:
+            stream.clients -= 1
+            clients.set(stream.clients)
+            if stream.clients == 0:
+                stream.jpeg = None  # Don't greet the next viewer with a stale frame
+                stream.last_frame = None  # ...but do encode the current one again for them
+
+    async def _main(self) -> None:
+        RESOURCES.pin_auxiliary_thread()  # Started after Detector(); keep it off the inference cores
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+        async with server:
+            await self._stopped.wait()
+            for task in list(self._handlers):
+                task.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    # ----- lifecycle -----
+
+    def start(self) -> None:
+        """Start serving; raises OSError if the port cannot be bound."""
+        if self._running:
+            return
+        self._running = True
+        self._error = None
+        self._started.clear()
+        self._threads = [
+            threading.Thread(target=self._serve, daemon=True, name="StreamServer"),
+            threading.Thread(target=self._encode_loop, daemon=True, name="StreamEncoder"),
+        ]
+        for thread in self._threads:
+            thread.start()
+        self._started.wait(timeout=5.0)
+        if self._error is not None:
+            error = self._error
+            self.stop()
+            raise error
+        print(f"[INFO] MJPEG streams at http://{self.host}:{self.port}/")
+
+    def _serve(self) -> None:
+        try:
+            asyncio.run(self._main())
+        except OSError as e:
+            self._error = e
+        finally:
+            self._loop = None
+            self._started.set()  # Also when binding failed, so start() does not wait it out
+
+    def stop(self) -> None:
+        if not self._running:
+            return
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        loop, stopped = self._loop, self._stopped
+        if loop is not None and stopped is not None:
+            try:
+                loop.call_soon_threadsafe(stopped.set)
+            except RuntimeError:
+                pass  # Event loop already closed
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
@@ -0,0 +1,95 @@
+import time
+import cv2
+import numpy as np
+import numpy.typing as npt
+from typing import Any, List, Optional, Tuple
+from utils.VideoSource import VideoSource, SourceType
+
+
+class SyntheticCapture:
+    """
+    In-memory stand-in for cv2.VideoCapture producing generated BGR frames.
+
+    A small ring of distinct frames is rendered once at construction; read()
+    then cycles through it. With allocate=True every read returns a fresh
+    array, matching the per-frame allocation a real decoder performs.
+
+    Args:
+        width (int): Frame width in pixels
+        height (int): Frame height in pixels
+        fps (float): Reported CAP_PROP_FPS, which paces the VideoSource thread
+        frame_count (Optional[int]): Frames to produce before signalling EOF (None = endless)
+        allocate (bool): Return a new array per read instead of the shared ring buffer
+        seed (int): Seed for the generated content
+    """
+
+    RING_SIZE: int = 8
+
+    def __init__(self, width: int = 1280, height: int = 720, fps: float = 30.0,
+                 frame_count: Optional[int] = None, allocate: bool = True, seed: int = 0) -> None:
+        self.width: int = width
+        self.height: int = height
+        self.fps: float = fps
+        self.frame_count: Optional[int] = frame_count
+        self.allocate: bool = allocate
+        self.position: int = 0
+        self.opened: bool = True
+        self._ring: List[npt.NDArray[np.uint8]] = self._render_ring(seed)
+
+    def _render_ring(self, seed: int) -> List[npt.NDArray[np.uint8]]:
+        rng = np.random.default_rng(seed)
+        base: npt.NDArray[np.uint8] = rng.integers(0, 256, (self.height, self.width, 3), dtype=np.uint8)
+        ring: List[npt.NDArray[np.uint8]] = []
+        box_w, box_h = max(self.width // 8, 1), max(self.height // 3, 1)
+        for i in range(self.RING_SIZE):
+            frame = base.copy()
+            # Moving block so consecutive frames differ like real footage
+            x = (i * self.width // self.RING_SIZE) % max(self.width - box_w, 1)
+            frame[self.height // 3:self.height // 3 + box_h, x:x + box_w] = (40 * i) % 256
+            ring.append(frame)
+        return ring
+
+    def isOpened(self) -> bool:
+        return self.opened
+
+    def read(self) -> Tuple[bool, Optional[npt.NDArray[np.uint8]]]:
+        if not self.opened or (self.frame_count is not None and self.position >= self.frame_count):
+            return False, None
+        frame = self._ring[self.position % self.RING_SIZE]
+        self.position += 1
+        return True, frame.copy() if self.allocate else frame
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count or 0)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        return 0.0
+
+    def release(self) -> None:
+        self.opened = False
+
+
+class SyntheticVideoSource(VideoSource):
+    """VideoSource fed by a SyntheticCapture, for benchmarks and tests without cameras or files."""
+
+    def __init__(self, source: SourceType, name: Optional[str] = None, width: int = 1280,
+                 height: int = 720, fps: float = 30.0, frame_count: Optional[int] = None,
+                 allocate: bool = True, open_delay: float = 0.0, **options: Any) -> None:
+        self.open_delay: float = open_delay  # Simulated cv2.VideoCapture connect latency
+        self.capture_args: dict[str, Any] = dict(
+            width=width, height=height, fps=fps, frame_count=frame_count, allocate=allocate,
+            seed=source if isinstance(source, int) else 0,
+        )
+        super().__init__(source, name=name, **options)
+
+    def _open_capture(self) -> SyntheticCapture:
+        if self.open_delay > 0:
+            time.sleep(self.open_delay)
+        return SyntheticCapture(**self.capture_args)
@@ -1,48 +1,198 @@
 import cv2
-from typing import List, Union
+import threading
+import time
+from typing import Callable, Dict, Final, List, Optional, Union
 from utils.VideoSource import VideoSource
 from utils.VideoSourceHelper import VideoSourceHelper
+from utils.EventBus import EVENTS, SOURCE
 
 SourceType = Union[int, str]
+SourceFactory = Callable[..., VideoSource]
+
+# cv2.VideoCapture cannot be interrupted, so a source that takes longer than this
+# is reported as failed and released if its open ever completes
+DEFAULT_OPEN_TIMEOUT: Final[float] = 10.0
 
 class VideoManager:
-    """Manages multiple VideoSource objects and detects new videos or cameras dynamically."""
+    """
+    Manages multiple VideoSource objects and detects new videos or cameras dynamically.
+
+    Sources are opened concurrently, one daemon thread each, because every
+    VideoSource constructor blocks on cv2.VideoCapture. The manager is usable
+    as soon as the first source opens: self.sources only ever holds opened
+    sources (kept in input order) and grows as the rest come up. Sources that
+    fail or exceed open_timeout are recorded in self.failed.
+    """
 
-    def __init__(self, sources: List[SourceType], video_folder: str = "videos") -> None:
+    def __init__(self, sources: List[SourceType], video_folder: str = "videos",
+                 source_factory: Optional[SourceFactory] = None,
+                 open_timeout: Optional[float] = DEFAULT_OPEN_TIMEOUT, parallel: bool = True) -> None:
         self.video_folder: str = video_folder
-        self.sources: List[VideoSource] = []
+        # Called as source_factory(src, name=...); lets benchmarks and replays swap in other VideoSource types
+        self.source_factory: SourceFactory = source_factory or VideoSource
+        self.open_timeout: Optional[float] = open_timeout
+        self.sources: List[VideoSource] = []  # Replaced, never mutated, so readers can iterate without locking
+
+        self.failed: Dict[str, str] = {}           # name -> reason
+        self.open_times: Dict[str, float] = {}     # name -> seconds from manager creation until opened
+        self._pending: Dict[str, SourceType] = {}  # name -> source still being opened
+        self._attempts: Dict[str, int] = {}        # name -> id of the open attempt whose result is wanted
+        self._names: Dict[SourceType, str] = {}    # source -> name it was first opened under, reused on retry
+        # source -> constructors still blocked on it, timed out or not; a count, because a superseded
+        # attempt finishing must not hide a newer one that is still blocked (remove + re-add)
+        self._in_flight: Dict[SourceType, int] = {}
+        self._order: Dict[str, int] = {}
+        self._next_index: int = 0
+        self._auto_start: bool = False
+        self._closed: bool = False
+        self._cond = threading.Condition()
+        self._created: float = time.perf_counter()
 
         # Initialize sources
-        for i, src in enumerate(sources):
-            self.sources.append(VideoSource(src, name=f"Source {i}"))
+        for src in sources:
+            self._open_async(src, name=f"Source {self._next_index}", wait=not parallel)
 
-    def start_all(self) -> None:
-        """Start all sources."""
-        success_count = 0
-        for source in self.sources:
-            try:
-                source.start()
-                print(f"[OK] Started {source.name}")
-                success_count += 1
-            except Exception as e:
-                print(f"[ERROR] {source.name} -> {e}")
-        if success_count == 0:
+    def _open_async(self, source: SourceType, name: str, wait: bool = False) -> None:
+        """Open a source in a daemon thread (or inline when wait=True)."""
+        with self._cond:
+            if name not in self._order:
+                self._order[name] = self._next_index
+                self._next_index += 1
+            self._names.setdefault(source, name)
+            self._pending[name] = source
+            self._in_flight[source] = self._in_flight.get(source, 0) + 1
+            self.failed.pop(name, None)  # A retry replaces the previous failure
+            attempt: int = self._attempts.get(name, 0) + 1
+            self._attempts[name] = attempt
+        if wait:
+            self._open_source(source, name, attempt)
+            return
+
+        threading.Thread(target=self._open_source, args=(source, name, attempt), daemon=True,
+                         name=f"VideoOpen-{name}").start()
+        if self.open_timeout is not None:
+            timer = threading.Timer(self.open_timeout, self._on_open_timeout, args=(name, attempt))
+            timer.daemon = True
+            timer.start()
+
+    def _is_wanted(self, name: str, attempt: int) -> bool:
+        """True while this open attempt has not timed out, been removed or been superseded. Call under _cond."""
+        return not self._closed and name in self._pending and self._attempts.get(name) == attempt
+
+    def _open_finished(self, source: SourceType) -> None:
+        """Count one constructor of source as returned. Call under _cond."""
+        remaining: int = self._in_flight.get(source, 0) - 1
+        if remaining > 0:
+            self._in_flight[source] = remaining
+        else:
+            self._in_flight.pop(source, None)
+
+    def _open_source(self, source: SourceType, name: str, attempt: int) -> None:
+        try:
+            new_source: VideoSource = self.source_factory(source, name=name)
+        except Exception as e:
+            with self._cond:
+                self._open_finished(source)
+                if not self._is_wanted(name, attempt):
+                    return
+                self._pending.pop(name, None)
+                self.failed[name] = str(e)
+                self._cond.notify_all()
+            EVENTS.emit(SOURCE, name, status="open failed", error=str(e))
+            return
+
+        with self._cond:
+            self._open_finished(source)
+            discard: bool = not self._is_wanted(name, attempt)
+            if not discard:
+                self._pending.pop(name, None)
+                self.failed.pop(name, None)
+                self.open_times[name] = time.perf_counter() - self._created
+                self.sources = sorted(self.sources + [new_source], key=lambda s: self._order.get(s.name, 0))
+                auto_start: bool = self._auto_start
+            self._cond.notify_all()
+
+        if discard:
+            new_source.stop()  # Opened too late, removed meanwhile or after stop_all; release the device
+            return
+        if auto_start:
+            self._start_source(new_source)
+
+    def _on_open_timeout(self, name: str, attempt: int) -> None:
+        with self._cond:
+            if not self._is_wanted(name, attempt):
+                return
+            self._pending.pop(name)
+            self.failed[name] = f"open timed out after {self.open_timeout:.1f}s"
+            self._cond.notify_all()
+        EVENTS.emit(SOURCE, name, status="open failed", error=f"timed out after {self.open_timeout:.1f}s")
+
+    def _start_source(self, source: VideoSource) -> bool:
+        try:
+            source.start()
+            EVENTS.emit(SOURCE, source.name, status="started")
+            return True
+        except Exception as e:
+            EVENTS.emit(SOURCE, source.name, status="start failed", error=str(e))
+            return False
+
+    def start_all(self, wait: bool = True) -> None:
+        """
+        Start every opened source; sources still opening start as soon as they open.
+
+        Args:
+            wait (bool): Block until the first source is live (or every open has failed)
+        """
+        with self._cond:
+            self._auto_start = True
+            opened: List[VideoSource] = list(self.sources)
+        success_count = sum(self._start_source(source) for source in opened)
+
+        if wait and success_count == 0 and not self.wait_for_first_source():
             print("[FATAL] No video sources available.")
             exit(1)
 
+    def wait_for_first_source(self, timeout: Optional[float] = None) -> bool:
+        """Block until at least one source is open or nothing is left pending. Returns True if one is open."""
+        with self._cond:
+            self._cond.wait_for(lambda: bool(self.sources) or not self._pending, timeout=timeout)
+            return bool(self.sources)
+
+    def wait_until_opened(self, timeout: Optional[float] = None) -> bool:
+        """Block until every open has succeeded, failed or timed out. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending, timeout=timeout)
+
     def get_active_sources(self) -> List[VideoSource]:
         """Return only active sources."""
         return [s for s in self.sources if s.is_active()]
 
     def add_new_source(self, source: SourceType, name: str) -> None:
-        """Add a new video source dynamically."""
-        try:
-            new_source = VideoSource(source, name=name)
-            new_source.start()
-            self.sources.append(new_source)
-            print(f"[INFO] Added new source '{name}'")
-        except Exception as e:
-            print(f"[ERROR] Could not add new source '{name}': {e}")
+        """Add a new video source dynamically; it is opened in the background and started once open."""
+        print(f"[INFO] Adding new source '{name}'")
+        with self._cond:
+            self._auto_start = True
+        self._open_async(source, name=name)
+
+    def remove_source(self, name: str) -> bool:
+        """
+        Stop and forget a source, including one that is still opening.
+
+        Returns:
+            bool: True if an opened source was stopped
+        """
+        with self._cond:
+            removed: Optional[VideoSource] = next((s for s in self.sources if s.name == name), None)
+            if removed is not None:
+                self.sources = [s for s in self.sources if s is not removed]
+            self._pending.pop(name, None)  # A still-running open is discarded when it completes
+            self.failed.pop(name, None)
+            self.open_times.pop(name, None)
+            self._cond.notify_all()
+        if removed is not None:
+            removed.stop()
+            EVENTS.emit(SOURCE, name, status="removed")
+        return removed is not None
 
     def restart_sources(self) -> None:
         """
@@ -53,23 +203,39 @@ class VideoManager:
         # Detect all available sources
         detected_sources = VideoSourceHelper.get_all_sources(self.video_folder)
 
-        # Add new sources that are not already managed
-        existing_sources_set = {s.source for s in self.sources}
+        # Add new sources that are not already managed or still opening. Failed ones are retried under
+        # their old name, but not while a timed-out open of the same source is still blocked.
+        with self._cond:
+            existing_sources_set = {s.source for s in self.sources} | set(self._pending.values()) | set(self._in_flight)
         for src in detected_sources:
             if src not in existing_sources_set:
-                self.add_new_source(src, name=f"Source {len(self.sources)}")
+                self.add_new_source(src, name=self._names.get(src, f"Source {self._next_index}"))
 
         # Restart stopped sources
         for source in self.sources:
             if not source.is_active():
                 try:
                     source.restart()
-                    print(f"[OK] Restarted source '{source.name}'")
+                    EVENTS.emit(SOURCE, source.name, status="restarted")
                 except RuntimeError as e:
-                    print(f"[ERROR] Could not restart '{source.name}': {e}")
+                    EVENTS.emit(SOURCE, source.name, status="restart failed", error=str(e))
+
+    def startup_report(self) -> str:
+        """Summarise open latency per source and failures, e.g. for the startup log."""
+        with self._cond:
+            lines: List[str] = [f"{name}: opened in {t * 1000:.0f} ms" for name, t in
+                                sorted(self.open_times.items(), key=lambda item: item[1])]
+            lines += [f"{name}: FAILED ({reason})" for name, reason in self.failed.items()]
+            lines += [f"{name}: still opening" for name in self._pending]
+        return "\n".join(lines)
 
     def stop_all(self) -> None:
         """Stop all video sources."""
+        with self._cond:
+            self._closed = True
         for source in self.sources:
             source.stop()
-        cv2.destroyAllWindows()
+        try:
+            cv2.destroyAllWindows()
+        except cv2.error:
+            pass  # Headless OpenCV builds (streaming-only servers, cluster workers) have no GUI
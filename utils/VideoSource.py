@@ -3,17 +3,56 @@ import threading
 import time
 import numpy as np
 import numpy.typing as npt
-from typing import Optional, Union, Any
+from typing import Optional, Union, Any, Tuple, Callable, List, NamedTuple
+from utils.Metrics import METRICS, LATENCY_BUCKETS
+from utils.EventBus import EVENTS, SOURCE
+from utils.ResourceManager import RESOURCES
 
 SourceType = Union[int, str]
+FrameListener = Callable[[npt.NDArray[Any], float], None]
+
+# Metric families shared by every source; each source binds its own labelled series
+_CAPTURE_SECONDS = METRICS.histogram("video_source_capture_seconds", "Time spent in VideoCapture.read()")
+_FRAME_AGE_SECONDS = METRICS.histogram(
+    "video_source_frame_age_seconds", "Age of the frame handed to read() since it was captured", LATENCY_BUCKETS
+)
+_FRAMES_CAPTURED = METRICS.counter("video_source_frames_captured", "Frames captured from the device or file")
+_FRAMES_DROPPED = METRICS.counter("video_source_frames_dropped", "Captured frames overwritten before any read()")
+_CAPTURE_FPS = METRICS.gauge("video_source_capture_fps", "Capture rate measured over the last second")
+_DOWNSCALE_SECONDS = METRICS.histogram("video_source_downscale_seconds", "Time producing inference/display frames per capture")
+
+
+class FrameBundle(NamedTuple):
+    """
+    Every resolution produced for one captured frame.
+
+    Arrays are shared with the capture thread, which only ever rebinds them,
+    so they are safe to read but must not be modified in place.
+    """
+    full: npt.NDArray[Any]
+    inference: Optional[npt.NDArray[Any]]  # Longest side == inference_size, aspect preserved
+    display: Optional[npt.NDArray[Any]]    # Exactly display_size (w, h)
+    capture_time: float
+
 
 class VideoSource:
     """Represents a single video source (camera or video file) with its own thread and active state."""
 
-    def __init__(self, source: SourceType, name: Optional[str] = None) -> None:
+    def __init__(self, source: SourceType, name: Optional[str] = None,
+                 inference_size: Optional[int] = None, display_size: Optional[Tuple[int, int]] = None) -> None:
+        """
+        Args:
+            source (SourceType): Camera index, file path or stream URL
+            name (Optional[str]): Display name, defaults to str(source)
+            inference_size (Optional[int]): Also produce a frame whose longest side is this size
+                (the detector input size) once per capture
+            display_size (Optional[Tuple[int, int]]): Also produce a (w, h) thumbnail once per capture
+        """
         self.source: SourceType = source
         self.name: str = name or str(source)
-        self.cap: cv2.VideoCapture = cv2.VideoCapture(source)
+        self.inference_size: Optional[int] = inference_size
+        self.display_size: Optional[Tuple[int, int]] = display_size
+        self.cap: cv2.VideoCapture = self._open_capture()
 
         if not self.cap.isOpened():
             raise RuntimeError(f"[{self.name}] Cannot open source {self.source}")
@@ -22,11 +61,68 @@ class VideoSource:
         self.source_fps: float = fps if fps > 0 else 30.0
 
         self.frame: Optional[npt.NDArray[Any]] = None
+        self.inference_frame: Optional[npt.NDArray[Any]] = None
+        self.display_frame: Optional[npt.NDArray[Any]] = None
         self.running: bool = False
         self.thread: Optional[threading.Thread] = None
         self.lock = threading.Lock()
         self.active: bool = False
 
+        # Capture bookkeeping for frame age / drop accounting
+        self.frame_time: float = 0.0
+        self.frame_consumed: bool = True
+        # Called from the capture thread as listener(frame, capture_time) for every new frame
+        self.frame_listeners: List[FrameListener] = []
+        self._bind_metrics()
+
+    def _open_capture(self) -> cv2.VideoCapture:
+        """Create the capture backend. Subclasses override this to feed frames from elsewhere."""
+        return cv2.VideoCapture(self.source)
+
+    def _bind_metrics(self) -> None:
+        """Resolve this source's labelled metric series once so the capture loop avoids lookups."""
+        self._m_capture = _CAPTURE_SECONDS.labels(source=self.name)
+        self._m_frame_age = _FRAME_AGE_SECONDS.labels(source=self.name)
+        self._m_captured = _FRAMES_CAPTURED.labels(source=self.name)
+        self._m_dropped = _FRAMES_DROPPED.labels(source=self.name)
+        self._m_fps = _CAPTURE_FPS.labels(source=self.name)
+        self._m_downscale = _DOWNSCALE_SECONDS.labels(source=self.name)
+
+    def _downscale(self, frame: npt.NDArray[Any]) -> Tuple[Optional[npt.NDArray[Any]], Optional[npt.NDArray[Any]]]:
+        """Produce the inference and display frames, reading the full-resolution pixels once."""
+        inference: Optional[npt.NDArray[Any]] = None
+        display: Optional[npt.NDArray[Any]] = None
+        h, w = frame.shape[:2]
+
+        if self.inference_size is not None:
+            scale: float = self.inference_size / max(h, w)
+            if scale < 1.0:
+                size = (max(round(w * scale), 1), max(round(h * scale), 1))
+                inference = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+            else:
+                inference = frame  # Never upscale; the detector letterboxes small frames itself
+
+        if self.display_size is not None:
+            dw, dh = self.display_size
+            # Derive the thumbnail from the inference frame whenever there is one, so the full-resolution
+            # pixels are read once per capture; upscaling e.g. 640x360 to 400x400 is fine for a thumbnail
+            base = inference if inference is not None else frame
+            display = cv2.resize(base, (dw, dh), interpolation=cv2.INTER_LINEAR)
+
+        return inference, display
+
+    def _frame_delay(self) -> float:
+        """Sleep between captures. Sources whose capture paces itself return 0."""
+        return 1.0 / self.source_fps
+
+    def add_frame_listener(self, listener: FrameListener) -> None:
+        """Register a callback receiving every captured frame (e.g. a FrameRecorder)."""
+        self.frame_listeners.append(listener)
+
+    def remove_frame_listener(self, listener: FrameListener) -> None:
+        if listener in self.frame_listeners:
+            self.frame_listeners.remove(listener)
+
     def start(self) -> None:
         """Start reading frames in a background thread."""
         if self.running:
@@ -37,25 +133,84 @@ class VideoSource:
         self.active = True
 
     def _update(self) -> None:
-        delay: float = 1.0 / self.source_fps
+        delay: float = self._frame_delay()
+        pinned_generation: int = RESOURCES.pin_capture_thread()
+        window_start: float = time.perf_counter()
+        window_frames: int = 0
         while self.running:
+            t0: float = time.perf_counter()
             ret, frame = self.cap.read()
+            t1: float = time.perf_counter()
             if not ret:
                 self.running = False
                 self.active = False
-                print(f"[INFO] Source '{self.name}' stopped or disconnected.")
+                EVENTS.emit(SOURCE, self.name, status="stopped or disconnected")
                 break
+            inference, display = None, None
+            if self.inference_size is not None or self.display_size is not None:
+                inference, display = self._downscale(frame)
+                self._m_downscale.observe(time.perf_counter() - t1)
             with self.lock:
+                dropped: bool = not self.frame_consumed
                 self.frame = frame
+                self.inference_frame = inference
+                self.display_frame = display
+                self.frame_time = t1
+                self.frame_consumed = False
+
+            for listener in list(self.frame_listeners):
+                try:
+                    listener(frame, t1)
+                except Exception as e:
+                    EVENTS.emit(SOURCE, self.name, status="frame listener removed", error=str(e))
+                    self.remove_frame_listener(listener)
+
+            self._m_capture.observe(t1 - t0)
+            self._m_captured.inc()
+            if dropped:
+                self._m_dropped.inc()
+            window_frames += 1
+            if t1 - window_start >= 1.0:
+                self._m_fps.set(window_frames / (t1 - window_start))
+                window_start, window_frames = t1, 0
+            if RESOURCES.generation != pinned_generation:
+                pinned_generation = RESOURCES.pin_capture_thread()  # Core layout changed (e.g. autotune)
             time.sleep(delay)
         self.running = False
 
     def read(self) -> Optional[npt.NDArray[Any]]:
         """Return the latest frame if active."""
+        return self.read_with_time()[0]
+
+    def read_with_time(self) -> Tuple[Optional[npt.NDArray[Any]], float]:
+        """Return the latest frame and its capture time (time.perf_counter() clock)."""
+        if not self.active:
+            return None, 0.0
+        with self.lock:
+            if self.frame is None:
+                return None, 0.0
+            self.frame_consumed = True
+            frame_time: float = self.frame_time
+            frame: npt.NDArray[Any] = self.frame.copy()
+        self._m_frame_age.observe(time.perf_counter() - frame_time)
+        return frame, frame_time
+
+    def read_bundle(self) -> Optional[FrameBundle]:
+        """
+        Return the latest frame at every produced resolution, without copying.
+
+        Consumers that only need the inference/display frames never touch the
+        full-resolution pixels, unlike read() which copies them.
+        """
         if not self.active:
             return None
         with self.lock:
-            return None if self.frame is None else self.frame.copy()
+            if self.frame is None:
+                return None
+            self.frame_consumed = True
+            bundle = FrameBundle(self.frame, self.inference_frame, self.display_frame, self.frame_time)
+        self._m_frame_age.observe(time.perf_counter() - bundle.capture_time)
+        return bundle
 
     def stop(self) -> None:
         self.running = False
@@ -68,7 +223,7 @@ class VideoSource:
     def restart(self) -> None:
         """Stop and reopen the source."""
         self.stop()
-        self.cap = cv2.VideoCapture(self.source)
+        self.cap = self._open_capture()
         if self.cap.isOpened():
             self.start()
         else: